@@ -1,17 +1,33 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from flask_bcrypt import Bcrypt
-from werkzeug.utils import secure_filename
+from sqlalchemy import event
+from sqlalchemy.orm import load_only, selectinload
+import io
 import os
+import queue
+import random
+import re
+import threading
+import time
 from datetime import datetime, timedelta
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+import orjson
+import numpy as np
 import dash
 from dash import dcc, html, Input, Output
 import plotly.express as px
 import plotly.graph_objects as go
 from backend.services.nlp_processor import TransactionProcessor
 from backend.services.savings_analyzer import SavingsAnalyzer
-from backend.models.database_models import db, User, Transaction, Category
+from backend.services import sms_regex_extractor
+from backend.services.sample_data import SAMPLE_EMAIL_TEXTS, REFRESH_SAMPLE_TRANSACTIONS
+from backend.models.database_models import db, User, Transaction, Category, description_prefix_hash, upgrade_schema
 
 # Try to import Gmail service (optional)
 try:
@@ -22,15 +38,28 @@ except ImportError:
     GMAIL_INTEGRATION_AVAILABLE = False
     print("Gmail integration not available. Install dependencies: pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib")
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize jsonify responses with orjson, falling back to Flask's encoder for unknown types"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__, 
            template_folder='frontend/templates',
            static_folder='frontend/static')
+app.json = ORJSONProvider(app)
 
 # Configuration
 app.config['SECRET_KEY'] = 'your-secret-key-here'  # Change this in production
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.abspath("database/finance_automator.db")}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = 'uploads'
+
+# Batch executemany INSERTs into multi-row statements
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'insertmanyvalues_page_size': 1000}
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # Data source configuration - Choose between 'sample' or 'gmail'
@@ -40,6 +69,20 @@ app.config['DATA_SOURCE_MODE'] = os.getenv('DATA_SOURCE_MODE', 'sample')  # Opti
 
 # Initialize extensions
 db.init_app(app)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL journaling and relaxed fsync for SQLite's many small write transactions"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-65536')  # 64MB page cache (negative = KiB)
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=134217728')  # 128MB
+    cursor.close()
+
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    with app.app_context():
+        event.listen(db.engine, 'connect', _set_sqlite_pragmas)
 bcrypt = Bcrypt(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -50,42 +93,195 @@ def load_user(user_id):
     return User.query.get(int(user_id))
 
 # Initialize NLP and Analytics services
+# These are built once at import time. When serving with gunicorn, preload the app so
+# forked workers share the loaded models instead of each loading their own copy:
+#   gunicorn --preload -w 4 app:app
 transaction_processor = TransactionProcessor()
 savings_analyzer = SavingsAnalyzer()
 
+# Mapping from lowercase NLP category names to database category names
+CATEGORY_MAPPING = {
+    'groceries': 'Groceries',
+    'utilities': 'Utilities',
+    'transportation': 'Transportation',
+    'entertainment': 'Entertainment',
+    'healthcare': 'Healthcare',
+    'dining': 'Dining',
+    'shopping': 'Shopping',
+    'bills': 'Bills',
+    'education': 'Education',
+    'other': 'Other'
+}
+
+# Lowercase NLP category name -> Category.id (categories are rarely-changing reference data)
+_CATEGORY_ID_CACHE: dict[str, int] = {}
+# Category.id -> Category.name, filled by the same refresh
+_CATEGORY_NAME_CACHE: dict[int, str] = {}
+# Local ORM changes expire the cache immediately; the TTL picks up changes made by other worker processes
+CATEGORY_CACHE_TTL = 300  # seconds
+_category_cache_expires_at = 0.0
+
+def _refresh_category_cache():
+    """Rebuild the category lookups with a single query and return the new (id map, name map)"""
+    global _CATEGORY_ID_CACHE, _CATEGORY_NAME_CACHE, _category_cache_expires_at
+    ids_by_name = {name: category_id for category_id, name in
+                   Category.query.with_entities(Category.id, Category.name).all()}
+    
+    # Fallback to 'Other' category for anything unmapped or missing from the database
+    other_id = ids_by_name.get('Other', 1)
+    
+    # Build fresh dicts and swap them in, so concurrent readers never see a half-filled cache
+    id_cache = {nlp_name: ids_by_name.get(db_name, other_id) for nlp_name, db_name in CATEGORY_MAPPING.items()}
+    name_cache = {category_id: name for name, category_id in ids_by_name.items()}
+    _CATEGORY_ID_CACHE, _CATEGORY_NAME_CACHE = id_cache, name_cache
+    _category_cache_expires_at = time.monotonic() + CATEGORY_CACHE_TTL
+    return id_cache, name_cache
+
 def get_category_id_from_name(category_name):
     """Helper function to get category ID from category name"""
-    if not category_name:
-        # Default to 'Other' category if no category provided
-        category = Category.query.filter_by(name='Other').first()
-        return category.id if category else 1
-    
-    # Create a mapping from lowercase NLP category names to database category names
-    category_mapping = {
-        'groceries': 'Groceries',
-        'utilities': 'Utilities', 
-        'transportation': 'Transportation',
-        'entertainment': 'Entertainment',
-        'healthcare': 'Healthcare',
-        'dining': 'Dining',
-        'shopping': 'Shopping',
-        'bills': 'Bills',
-        'education': 'Education',
-        'other': 'Other'
-    }
+    id_cache = _CATEGORY_ID_CACHE
+    if not id_cache or time.monotonic() >= _category_cache_expires_at:
+        id_cache, _ = _refresh_category_cache()
     
-    # Map NLP category name to database category name
-    db_category_name = category_mapping.get(category_name.lower(), 'Other')
+    return id_cache.get((category_name or 'other').lower(), id_cache['other'])
+
+def get_category_name(category_id):
+    """Helper function to resolve a category ID to its name"""
+    name_cache = _CATEGORY_NAME_CACHE
+    if category_id not in name_cache or time.monotonic() >= _category_cache_expires_at:
+        _, name_cache = _refresh_category_cache()
     
-    # Get category from database
-    category = Category.query.filter_by(name=db_category_name).first()
+    return name_cache.get(category_id, 'Other')
+
+@event.listens_for(Category, 'after_insert')
+@event.listens_for(Category, 'after_update')
+@event.listens_for(Category, 'after_delete')
+def _invalidate_category_cache(mapper, connection, target):
+    """Expire the cached category lookups when categories change so the next lookup rebuilds them"""
+    global _category_cache_expires_at
+    _category_cache_expires_at = 0.0
+
+# Short-lived per-user cache for read-heavy dashboard/analytics aggregates, keyed by (user_id, bucket)
+_ANALYTICS_CACHE = TTLCache(maxsize=1024, ttl=30)
+_ANALYTICS_CACHE_LOCK = threading.Lock()
+
+def _cache_get(key):
+    """Return a cached aggregate, or None if missing/expired"""
+    with _ANALYTICS_CACHE_LOCK:
+        return _ANALYTICS_CACHE.get(key)
+
+def _cache_set(key, value):
+    """Store an aggregate in the cache"""
+    with _ANALYTICS_CACHE_LOCK:
+        _ANALYTICS_CACHE[key] = value
+
+def _transactions_version(user_id):
+    """Cheap (max id, max updated_at) stamp that changes whenever a user's transactions are added or edited"""
+    return tuple(db.session.query(
+        db.func.max(Transaction.id), db.func.max(Transaction.updated_at)
+    ).filter(Transaction.user_id == user_id).one())
+
+def invalidate_user_cache(user_id):
+    """Drop all cached aggregates for a user after their transactions change"""
+    with _ANALYTICS_CACHE_LOCK:
+        for key in [key for key in _ANALYTICS_CACHE.keys() if key[0] == user_id]:
+            _ANALYTICS_CACHE.pop(key, None)
+
+def _prefetch(iterable, max_buffered=32):
+    """Consume an iterable in a background thread so its I/O overlaps with the caller's work"""
+    buffer = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+    done = object()
     
-    if category:
-        return category.id
+    def produce():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    break
+                buffer.put(item)
+        finally:
+            buffer.put(done)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(produce)
+        try:
+            while True:
+                item = buffer.get()
+                if item is done:
+                    break
+                yield item
+        except GeneratorExit:
+            # Consumer stopped early - unblock the producer and wait for it to finish
+            stop.set()
+            while buffer.get() is not done:
+                pass
+            raise
+        
+        # Re-raise any error from the producer thread
+        future.result()
+
+# Transactions with the same amount, type and description prefix within this window are duplicates
+DUPLICATE_WINDOW = timedelta(minutes=5)
+
+def _duplicate_key(amount, transaction_type, prefix_hash):
+    """Build the (amount, type, description prefix hash) key used for duplicate detection"""
+    return (round(float(amount), 2), transaction_type, prefix_hash)
+
+def _load_duplicate_index(user_id, transaction_lists):
+    """Preload a user's transactions that could collide with the parsed ones as {duplicate key: [dates]}"""
+    index = defaultdict(list)
+    dates = [trans_data['date'] for transactions_data in transaction_lists for trans_data in transactions_data]
+    if not dates:
+        return index
+    
+    # Only rows within the duplicate window of the parsed dates can match, so skip the rest of the history
+    rows = db.session.query(
+        Transaction.amount, Transaction.transaction_type, Transaction.date, Transaction.description_prefix_hash
+    ).filter(Transaction.user_id == user_id)\
+     .filter(Transaction.date.between(min(dates) - DUPLICATE_WINDOW, max(dates) + DUPLICATE_WINDOW))
+    
+    for amount, transaction_type, date, prefix_hash in rows:
+        index[_duplicate_key(amount, transaction_type, prefix_hash)].append(date)
+    return index
+
+def _is_duplicate(index, key, date):
+    """Check whether a transaction with this key already exists within the duplicate window"""
+    return any(abs(existing - date) <= DUPLICATE_WINDOW for existing in index.get(key, ()))
+
+# Batches larger than this are written with one executemany INSERT instead of per-object ORM adds
+BULK_INSERT_THRESHOLD = 20
+
+def _bulk_insert_transactions(rows):
+    """Insert transaction rows (list of column dicts with identical keys)"""
+    if len(rows) > BULK_INSERT_THRESHOLD:
+        # No RETURNING needed - callers don't use the new ids, so this stays a plain batched executemany
+        db.session.execute(Transaction.__table__.insert(), rows)
     else:
-        # Fallback to 'Other' category
-        other_category = Category.query.filter_by(name='Other').first()
-        return other_category.id if other_category else 1
+        db.session.add_all([Transaction(**row) for row in rows])
+
+# Gmail API clients wrap an httplib2 transport that is not thread-safe, so they are never shared between
+# concurrent requests. Single-account clients are built per request (GmailService caches the OAuth
+# credentials, so this skips the token load); each user gets their own multi-account service, which keeps
+# that user's configured accounts for the life of the process and is used by one of their requests at a time.
+_MULTI_GMAIL_SERVICES = {}  # user id -> (MultiAccountGmailService, lock)
+_MULTI_GMAIL_SERVICES_LOCK = threading.Lock()
+
+def get_gmail_service():
+    """Build a GmailService for the current request from the cached OAuth credentials"""
+    return GmailService()
+
+@contextmanager
+def use_multi_gmail_service(user_id):
+    """Hold exclusive use of a user's MultiAccountGmailService for the duration of the block"""
+    # The registry lock only guards the dict; syncs and OAuth flows run under the per-user lock
+    with _MULTI_GMAIL_SERVICES_LOCK:
+        entry = _MULTI_GMAIL_SERVICES.get(user_id)
+        if entry is None:
+            entry = _MULTI_GMAIL_SERVICES[user_id] = (MultiAccountGmailService(), threading.Lock())
+    
+    multi_gmail, user_lock = entry
+    with user_lock:
+        yield multi_gmail
 
 @app.route('/')
 def index():
@@ -145,24 +341,29 @@ def logout():
 @login_required
 def dashboard():
     # Get user's recent transactions
-    recent_transactions = Transaction.query.filter_by(user_id=current_user.id)\
+    recent_transactions = Transaction.query.options(selectinload(Transaction.category))\
+                                         .filter_by(user_id=current_user.id)\
                                          .order_by(Transaction.date.desc())\
                                          .limit(10).all()
     
-    # Get spending summary
-    total_spending = db.session.query(db.func.sum(Transaction.amount))\
-                              .filter_by(user_id=current_user.id).scalar() or 0
-    
-    # Get category breakdown
-    category_spending = db.session.query(Category.name, db.func.sum(Transaction.amount))\
-                                 .join(Transaction)\
-                                 .filter(Transaction.user_id == current_user.id)\
-                                 .group_by(Category.name).all()
+    # Get spending summary and category breakdown (cached briefly per user)
+    cache_key = (current_user.id, 'dashboard')
+    summary = _cache_get(cache_key)
+    if summary is None:
+        total_spending = db.session.query(db.func.sum(Transaction.amount))\
+                                  .filter_by(user_id=current_user.id).scalar() or 0
+        
+        category_spending = db.session.query(Category.name, db.func.sum(Transaction.amount))\
+                                     .join(Transaction)\
+                                     .filter(Transaction.user_id == current_user.id)\
+                                     .group_by(Category.name).all()
+        
+        summary = {'total_spending': total_spending, 'category_spending': category_spending}
+        _cache_set(cache_key, summary)
     
     return render_template('dashboard.html', 
                          recent_transactions=recent_transactions,
-                         total_spending=total_spending,
-                         category_spending=category_spending)
+                         **summary)
 
 @app.route('/upload', methods=['GET', 'POST'])
 @login_required
@@ -176,40 +377,33 @@ def upload_data():
             return jsonify({'error': 'No file selected'}), 400
         
         if file:
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            # Process the uploaded file
+            # Process the uploaded file straight from the request stream (no temp file on disk)
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    text_content = f.read()
+                text_stream = io.TextIOWrapper(file.stream, encoding='utf-8', errors='replace')
                 
-                # Extract transactions using NLP
-                transactions = transaction_processor.extract_transactions(text_content)
+                # Extract transactions using NLP, message by message as lines are read
+                transactions = transaction_processor.extract_transactions_iter(text_stream)
                 
                 # Save transactions to database
-                saved_count = 0
+                rows = []
                 for trans_data in transactions:
                     # Get category ID from category name
                     category_id = get_category_id_from_name(trans_data.get('category'))
                     
-                    transaction = Transaction(
-                        user_id=current_user.id,
-                        amount=trans_data['amount'],
-                        description=trans_data['description'],
-                        date=trans_data['date'],
-                        category_id=category_id,
-                        merchant=trans_data.get('merchant', ''),
-                        transaction_type=trans_data.get('type', 'debit')
-                    )
-                    db.session.add(transaction)
-                    saved_count += 1
+                    rows.append({
+                        'user_id': current_user.id,
+                        'amount': trans_data['amount'],
+                        'description': trans_data['description'],
+                        'date': trans_data['date'],
+                        'category_id': category_id,
+                        'merchant': trans_data.get('merchant', ''),
+                        'transaction_type': trans_data.get('type', 'debit')
+                    })
                 
+                _bulk_insert_transactions(rows)
                 db.session.commit()
-                
-                # Clean up uploaded file
-                os.remove(filepath)
+                invalidate_user_cache(current_user.id)
+                saved_count = len(rows)
                 
                 return jsonify({'success': f'Successfully processed {saved_count} transactions'}), 200
                 
@@ -218,55 +412,64 @@ def upload_data():
     
     return render_template('upload.html')
 
-@app.route('/analytics')
-@login_required
-def analytics():
-    """Advanced analytics page with real user data"""
-    from datetime import datetime, timedelta
-    from collections import defaultdict
-    
-    # Get time period from query params (default: last 6 months)
-    months = request.args.get('months', 6, type=int)
-    start_date = datetime.now() - timedelta(days=months*30)
-    
-    # Get all user transactions
-    transactions = Transaction.query.filter_by(user_id=current_user.id)\
-                                   .filter(Transaction.date >= start_date)\
-                                   .order_by(Transaction.date.desc()).all()
+def _conditional_sum(condition):
+    """SUM of transaction amounts matching condition (0 when nothing matches), for single-pass aggregates"""
+    return db.func.coalesce(db.func.sum(db.case((condition, Transaction.amount), else_=0)), 0)
+
+def _compute_analytics(user_id, months):
+    """Aggregate analytics page data for a user, served from the short-TTL cache when warm"""
+    cache_key = (user_id, months)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+    
+    now = datetime.now()
+    start_date = now - timedelta(days=months*30)
+    
+    # Month-over-month comparison windows (previous window is half-open so the two don't overlap)
+    current_month_start = now - timedelta(days=30)
+    previous_month_start = now - timedelta(days=60)
+    
+    is_debit = Transaction.transaction_type == 'debit'
+    is_credit = Transaction.transaction_type == 'credit'
+    
+    # Calculate summary statistics and month comparisons in a single aggregate query
+    totals = db.session.query(
+        _conditional_sum(is_debit).label('spending'),
+        _conditional_sum(is_credit).label('income'),
+        db.func.count(Transaction.id).label('count'),
+        _conditional_sum(db.and_(is_debit, Transaction.date >= previous_month_start,
+                                Transaction.date < current_month_start)).label('previous_spending'),
+        _conditional_sum(db.and_(is_debit, Transaction.date >= current_month_start)).label('current_spending'),
+        _conditional_sum(db.and_(is_credit, Transaction.date >= current_month_start)).label('current_income')
+    ).filter(Transaction.user_id == user_id)\
+     .filter(Transaction.date >= start_date)\
+     .one()
     
-    # Calculate summary statistics
-    total_spending = sum(t.amount for t in transactions if t.transaction_type == 'debit')
-    total_income = sum(t.amount for t in transactions if t.transaction_type == 'credit')
-    total_transactions = len(transactions)
+    total_spending = totals.spending
+    total_income = totals.income
+    total_transactions = totals.count
     avg_transaction = total_spending / total_transactions if total_transactions > 0 else 0
     
-    # Get active categories
-    active_categories = db.session.query(Category.name, db.func.count(Transaction.id))\
-                                 .join(Transaction)\
-                                 .filter(Transaction.user_id == current_user.id)\
-                                 .filter(Transaction.date >= start_date)\
-                                 .filter(Transaction.transaction_type == 'debit')\
-                                 .group_by(Category.name)\
-                                 .all()
-    
-    # Category spending breakdown
+    # Category spending breakdown (one row per active category: name, count, total)
     category_spending = db.session.query(
         Category.name,
+        db.func.count(Transaction.id).label('count'),
         db.func.sum(Transaction.amount).label('total')
     ).join(Transaction)\
-     .filter(Transaction.user_id == current_user.id)\
+     .filter(Transaction.user_id == user_id)\
      .filter(Transaction.date >= start_date)\
      .filter(Transaction.transaction_type == 'debit')\
      .group_by(Category.name)\
-     .order_by(db.text('total DESC'))\
      .all()
+    category_spending.sort(key=lambda row: row.total, reverse=True)
     
     # Top merchants
     top_merchants = db.session.query(
         Transaction.merchant,
         db.func.count(Transaction.id).label('count'),
         db.func.sum(Transaction.amount).label('total')
-    ).filter(Transaction.user_id == current_user.id)\
+    ).filter(Transaction.user_id == user_id)\
      .filter(Transaction.date >= start_date)\
      .filter(Transaction.transaction_type == 'debit')\
      .filter(Transaction.merchant != '')\
@@ -275,54 +478,64 @@ def analytics():
      .limit(5)\
      .all()
     
-    # Monthly spending trend
-    monthly_spending = db.session.query(
-        db.func.strftime('%Y-%m', Transaction.date).label('month'),
+    # Monthly spending trend (grouped on the indexed integer YYYYMM bucket)
+    monthly_rows = db.session.query(
+        Transaction.year_month,
         db.func.sum(Transaction.amount).label('total')
-    ).filter(Transaction.user_id == current_user.id)\
+    ).filter(Transaction.user_id == user_id)\
      .filter(Transaction.date >= start_date)\
      .filter(Transaction.transaction_type == 'debit')\
-     .group_by(db.func.strftime('%Y-%m', Transaction.date))\
-     .order_by('month')\
+     .group_by(Transaction.year_month)\
+     .order_by(Transaction.year_month)\
      .all()
+    monthly_spending = [(f'{year_month // 100:04d}-{year_month % 100:02d}', total)
+                        for year_month, total in monthly_rows]
     
-    # Get previous month's spending for comparison
-    previous_month_start = datetime.now() - timedelta(days=60)
-    previous_month_end = datetime.now() - timedelta(days=30)
-    previous_spending = sum(t.amount for t in transactions 
-                          if previous_month_start <= t.date <= previous_month_end 
-                          and t.transaction_type == 'debit')
-    
-    current_month_spending = sum(t.amount for t in transactions 
-                               if t.date >= datetime.now() - timedelta(days=30)
-                               and t.transaction_type == 'debit')
+    # Compare against previous month's spending
+    previous_spending = totals.previous_spending
+    current_month_spending = totals.current_spending
     
     spending_change = ((current_month_spending - previous_spending) / previous_spending * 100) if previous_spending > 0 else 0
     
     # Calculate savings
-    current_month_income = sum(t.amount for t in transactions 
-                              if t.date >= datetime.now() - timedelta(days=30)
-                              and t.transaction_type == 'credit')
+    current_month_income = totals.current_income
     savings_this_month = current_month_income - current_month_spending
     
-    return render_template('analytics.html',
-                         total_spending=total_spending,
-                         total_income=total_income,
-                         total_transactions=total_transactions,
-                         avg_transaction=avg_transaction,
-                         active_categories=len(active_categories),
-                         category_spending=category_spending,
-                         top_merchants=top_merchants,
-                         monthly_spending=monthly_spending,
-                         spending_change=spending_change,
-                         savings_this_month=savings_this_month,
-                         months_period=months)
+    result = {
+        'total_spending': total_spending,
+        'total_income': total_income,
+        'total_transactions': total_transactions,
+        'avg_transaction': avg_transaction,
+        'active_categories': len(category_spending),
+        'category_spending': category_spending,
+        'top_merchants': top_merchants,
+        'monthly_spending': monthly_spending,
+        'spending_change': spending_change,
+        'savings_this_month': savings_this_month,
+        'months_period': months
+    }
+    _cache_set(cache_key, result)
+    return result
+
+@app.route('/analytics')
+@login_required
+def analytics():
+    """Advanced analytics page with real user data"""
+    # Get time period from query params (default: last 6 months)
+    months = request.args.get('months', 6, type=int)
+    
+    return render_template('analytics.html', **_compute_analytics(current_user.id, months))
 
 @app.route('/savings')
 @login_required
 def savings():
-    # Generate savings recommendations
-    user_transactions = Transaction.query.filter_by(user_id=current_user.id).all()
+    # Generate savings recommendations (load only the columns and lookback window the analyzer reads)
+    cutoff_date = datetime.now() - timedelta(days=30 * savings_analyzer.lookback_months)
+    user_transactions = Transaction.query.options(
+        load_only(Transaction.amount, Transaction.date, Transaction.transaction_type,
+                  Transaction.merchant, Transaction.category_id),
+        selectinload(Transaction.category)
+    ).filter(Transaction.user_id == current_user.id, Transaction.date >= cutoff_date).all()
     recommendations = savings_analyzer.generate_recommendations(user_transactions)
     
     return render_template('savings.html', recommendations=recommendations)
@@ -352,13 +565,15 @@ def gmail_setup():
                          instructions=setup_instructions,
                          available=GMAIL_INTEGRATION_AVAILABLE)
 
+# Sample transaction date distribution over the last 180 days for better trends
+# Recent months get more weight (more transactions); normalized once for vectorized sampling
+SAMPLE_DATE_WEIGHTS = 1 + np.arange(180) / 30
+SAMPLE_DATE_PROBABILITIES = SAMPLE_DATE_WEIGHTS / SAMPLE_DATE_WEIGHTS.sum()
+
 @app.route('/api/gmail/sync', methods=['POST'])
 @login_required
 def sync_gmail():
     """Sync transactions - supports both sample data and real Gmail integration"""
-    from datetime import datetime, timedelta
-    import random
-    
     try:
         # Get data source mode from config or request
         data = request.get_json() if request.is_json else {}
@@ -374,7 +589,7 @@ def sync_gmail():
                 }), 400
             
             # Initialize Gmail service
-            gmail_service = GmailService()
+            gmail_service = get_gmail_service()
             
             if not gmail_service.authenticated:
                 return jsonify({
@@ -382,76 +597,85 @@ def sync_gmail():
                     'suggestion': 'Visit /gmail-setup to configure Gmail integration'
                 }), 400
             
-            # Fetch emails from Gmail
-            print(f"🔍 Fetching emails from Gmail (last {days_back} days)...")
-            emails = gmail_service.search_transaction_emails(days_back=days_back)
-            print(f"📧 Found {len(emails)} emails to process")
-            
-            if not emails:
-                return jsonify({
-                    'message': 'No transaction emails found in Gmail',
-                    'count': 0,
-                    'skipped': 0,
-                    'mode': 'gmail'
-                }), 200
+            # Preload already-synced message IDs once instead of querying per transaction
+            existing_ids = {
+                message_id for (message_id,) in db.session.query(Transaction.gmail_message_id)
+                .filter(Transaction.user_id == current_user.id)
+                .filter(Transaction.gmail_message_id.isnot(None))
+            }
             
-            # Initialize NLP processor
-            total_processed = 0
+            emails = []
+            new_emails = []
+            rows = []
             total_skipped = 0
             
-            for email in emails:
-                # Check if already processed by Gmail message ID
-                existing = Transaction.query.filter_by(
-                    user_id=current_user.id,
-                    gmail_message_id=email.get('id')
-                ).first()
-                
-                if existing:
-                    total_skipped += 1
-                    continue
-                
-                # Process email with NLP
-                transactions_data = transaction_processor.process_text(email['body'])
-                
+            def new_email_bodies():
+                """Yield bodies of not-yet-synced emails as they arrive from Gmail"""
+                nonlocal total_skipped
+                for email in _prefetch(gmail_service.iter_transaction_emails(days_back=days_back)):
+                    emails.append(email)
+                    
+                    # Check if already processed by Gmail message ID
+                    if email.get('id') in existing_ids:
+                        total_skipped += 1
+                        continue
+                    existing_ids.add(email.get('id'))
+                    new_emails.append(email)
+                    yield email['body']
+            
+            # Fetch emails from Gmail in the background while NLP runs on the ones already received
+            print(f"🔍 Fetching emails from Gmail (last {days_back} days)...")
+            parsed_emails = list(transaction_processor.process_texts(new_email_bodies()))
+            
+            # Duplicate keys are loaded once, for the date range the parsed transactions cover
+            duplicate_index = _load_duplicate_index(current_user.id, parsed_emails)
+            
+            for index, transactions_data in enumerate(parsed_emails):
+                email = new_emails[index]
                 for trans_data in transactions_data:
                     # Double check: look for duplicates by amount, date and description
-                    description_start = trans_data['description'][:100]
-                    existing_duplicate = Transaction.query.filter_by(
-                        user_id=current_user.id,
-                        amount=trans_data['amount'],
-                        transaction_type=trans_data.get('type', 'debit')
-                    ).filter(
-                        Transaction.date >= trans_data['date'] - timedelta(minutes=5),
-                        Transaction.date <= trans_data['date'] + timedelta(minutes=5)
-                    ).filter(
-                        Transaction.description.like(f"{description_start}%")
-                    ).first()
+                    duplicate_key = _duplicate_key(trans_data['amount'], trans_data.get('type', 'debit'),
+                                                   description_prefix_hash(trans_data['description']))
                     
-                    if existing_duplicate:
+                    if _is_duplicate(duplicate_index, duplicate_key, trans_data['date']):
                         total_skipped += 1
                         continue
                     
+                    # Track in-batch rows so repeats within this sync are caught too
+                    duplicate_index[duplicate_key].append(trans_data['date'])
+                    
                     # Get category ID from category name
                     category_id = get_category_id_from_name(trans_data.get('category'))
                     
-                    transaction = Transaction(
-                        user_id=current_user.id,
-                        amount=trans_data['amount'],
-                        description=trans_data['description'],
-                        date=trans_data['date'],
-                        category_id=category_id,
-                        merchant=trans_data.get('merchant', ''),
-                        transaction_type=trans_data.get('type', 'debit'),
-                        source='gmail',
-                        gmail_message_id=email.get('id'),
-                        raw_text=email['body'][:1000],
-                        confidence_score=trans_data.get('confidence', 0.8)
-                    )
-                    db.session.add(transaction)
-                    total_processed += 1
+                    rows.append({
+                        'user_id': current_user.id,
+                        'amount': trans_data['amount'],
+                        'description': trans_data['description'],
+                        'date': trans_data['date'],
+                        'category_id': category_id,
+                        'merchant': trans_data.get('merchant', ''),
+                        'transaction_type': trans_data.get('type', 'debit'),
+                        'source': 'gmail',
+                        'gmail_message_id': email.get('id'),
+                        'raw_text': email['body'][:1000],
+                        'confidence_score': trans_data.get('confidence', 0.8)
+                    })
                     print(f"✅ Gmail: ₹{trans_data['amount']} - {trans_data['description']}")
             
+            print(f"📧 Found {len(emails)} emails to process")
+            
+            if not emails:
+                return jsonify({
+                    'message': 'No transaction emails found in Gmail',
+                    'count': 0,
+                    'skipped': 0,
+                    'mode': 'gmail'
+                }), 200
+            
+            _bulk_insert_transactions(rows)
             db.session.commit()
+            invalidate_user_cache(current_user.id)
+            total_processed = len(rows)
             
             return jsonify({
                 'message': f'Successfully synced {total_processed} transactions from Gmail',
@@ -465,229 +689,99 @@ def sync_gmail():
         else:
             print("📊 Using SAMPLE DATA mode - Processing email-like text samples")
             
-            # Initialize NLP processor for sample emails
-            processor = transaction_processor
-            
-            # Sample EMAIL TEXTS for NLP processor to parse (realistic banking emails)
-            sample_email_texts = [
-                # HDFC Bank samples (various formats)
-                """Dear Customer, Your A/c XX1234 is debited with Rs.1,250.50 on 25-Nov-24 for purchase at BIG BAZAAR. 
-                Available balance: Rs.45,230.75. Info: HDFC Bank""",
-                
-                """Alert: Rs 850.75 debited from your account XX1234 on 26-Nov-24. 
-                Transaction at DMART SUPERMARKET via Card ending 4567. 
-                Avl Bal: Rs 44,380.00 -HDFC Bank""",
-                
-                # SBI Bank samples
-                """SBI: Your account XX5678 debited by INR 2,100.00 on 24-Nov-24 14:32 PM 
-                at RELIANCE FRESH. Ref# 123456789. Avl bal INR 42,280.00""",
-                
-                """Transaction Alert: INR 450.00 spent on 25-Nov-24 at STARBUCKS COFFEE using card XX9012. 
-                Current balance: INR 41,830.00 -State Bank of India""",
-                
-                # ICICI Bank samples
-                """ICICI Bank: Rs.1200.00 debited from A/c XX3456 on 26-NOV-24 
-                for txn at PIZZA HUT. Available Bal:Rs.40,630.00""",
-                
-                """Your ICICI Bank Card XX7890 charged Rs 350 at MCDONALDS on 27-Nov-24. 
-                Avl limit: Rs 40,280""",
-                
-                # UPI transactions
-                """Rs 800 debited from your a/c XX1234 via UPI to SWIGGY on 25-Nov-24 18:45. 
-                UPI Ref: 435678901234. Bal: Rs 39,480 -HDFC""",
-                
-                """UPI Payment successful! Rs.250.00 paid to UBER INDIA via UPI on 26-Nov-24. 
-                Ref: 987654321098. Account balance: Rs.39,230.00""",
-                
-                # Online shopping
-                """Payment of Rs 3,500.00 made to AMAZON SELLER SERVICES on 24-Nov-24 
-                from card XX4567. Transaction ID: AMZ123456789. -ICICI Bank""",
-                
-                """Your a/c debited Rs.1,800.00 on 25-Nov-24 for MYNTRA DESIGNS purchase. 
-                Order ID: MYN987654. Balance: Rs.35,930.00""",
-                
-                """Card transaction alert: Rs 2,200 spent at FLIPKART on 26-Nov-24. 
-                Txn ref: FKT456789. Available bal: Rs 33,730""",
-                
-                # Entertainment & subscriptions
-                """Your subscription payment of Rs.199.00 to NETFLIX.COM processed successfully on 25-Nov-24. 
-                Card XX5678 charged. Next billing: 25-Dec-24""",
-                
-                """Auto-debit: Rs 149 paid to SPOTIFY PREMIUM on 26-Nov-24 from a/c XX1234. 
-                Subscription active till 26-Dec-24. Bal: Rs 33,382""",
-                
-                """Rs.500.00 paid for BOOKMYSHOW tickets on 27-Nov-24. 
-                Booking ID: BMS123456. Transaction successful.""",
-                
-                # Transportation
-                """OLA CABS: Payment of Rs 150 completed on 25-Nov-24. 
-                Trip ID: OLA123456789. Paid via UPI from XX1234""",
-                
-                """Fuel purchase of Rs.2,500.00 at HP PETROL PUMP on 26-Nov-24 14:30 
-                using card XX9012. Balance: Rs.30,732.00""",
-                
-                # Utilities & bills
-                """BESCOM Bill Payment: Rs 2,800.00 debited from a/c XX1234 on 25-Nov-24. 
-                Bill period: Oct-24. Ref: BES987654321. Balance: Rs 27,932""",
-                
-                """Your Airtel Broadband bill of Rs.1,200.00 paid successfully on 26-Nov-24. 
-                Service number: 9876543210. Account: XX5678""",
-                
-                """Mobile recharge of Rs 450 for Jio number 9876543210 successful. 
-                Validity extended to 26-Dec-24. Paid from card XX1234""",
-                
-                # Healthcare
-                """Payment of Rs.800.00 made to APOLLO PHARMACY on 25-Nov-24. 
-                Prescription ID: APL123456. Card XX4567 used.""",
-                
-                """Rs 1,500 paid to CITY HOSPITAL for consultation on 26-Nov-24. 
-                Patient ID: 123456. UPI Ref: 456789012345""",
-                
-                # Large payments (EMI, credit card)
-                """Dear Customer, Rs.15,000.00 paid towards HDFC Credit Card bill on 25-Nov-24. 
-                Card ending 4567. Due date: 15-Dec-24. Outstanding: Rs.5,000.00""",
-                
-                """EMI Debit Alert: Rs 25,000 deducted from a/c XX5678 for SBI HOME LOAN on 26-Nov-24. 
-                Loan A/c: HL123456789. Balance: Rs.52,932.00 -SBI""",
-                
-                # Credits/Income
-                """Rs.75,000.00 credited to your account XX1234 on 25-Nov-24. 
-                Description: SALARY CREDIT - COMPANY PAYROLL. Balance: Rs.1,27,932.00""",
-                
-                """IMPS Credit: Rs 5,000.00 received in a/c XX1234 on 26-Nov-24 20:15. 
-                From: FREELANCE CLIENT. Ref: IMPS123456789. Bal: Rs 1,32,932""",
-                
-                # WRONG/MALFORMED SAMPLES (for testing processor robustness)
-                
-                # Missing amount
-                """Alert: Transaction at Big Bazaar on 25-Nov-24. 
-                Your card was used. Please check your account.""",
-                
-                # Promotional email (should be filtered)
-                """SALE ALERT! Get 50% off on all products at Big Bazaar! 
-                Hurry! Limited time offer. Shop now and save big!""",
-                
-                # Incomplete transaction
-                """Payment failed at Amazon on 26-Nov-24. 
-                Insufficient balance. Please add funds to your account.""",
-                
-                # OTP/Security message (not a transaction)
-                """Your OTP for HDFC NetBanking is 123456. Valid for 10 minutes. 
-                Do not share with anyone. -HDFC Bank""",
-                
-                # Account statement notification (not a transaction)
-                """Your account statement for Oct-2024 is ready. 
-                Download from netbanking. Total transactions: 45. -ICICI Bank""",
-                
-                # Malformed amount format
-                """Rs abc paid to merchant on date. Transaction successful. 
-                Balance: xyz rupees""",
-                
-                # Very old format
-                """Dear Sir/Madam, We wish to inform you that an amount of 
-                Rupees Five Hundred Fifty only has been debited from your account 
-                on the twenty-fifth day of November.""",
-                
-                # Multiple amounts (should pick transaction amount)
-                """Rs 999.00 debited for purchase at Store XYZ on 25-Nov-24. 
-                Cashback: Rs 50.00. Net amount: Rs 949.00. Balance: Rs 50,000.00""",
-            ]
-            
-            # Remove existing Gmail transactions to avoid duplicates
-            existing_gmail_transactions = Transaction.query.filter_by(
-                user_id=current_user.id,
-                source='gmail'
-            ).all()
-            
-            removed_count = len(existing_gmail_transactions)
-            for transaction in existing_gmail_transactions:
-                db.session.delete(transaction)
+            # Remove existing Gmail transactions to avoid duplicates (single DELETE statement)
+            delete_result = db.session.execute(
+                db.delete(Transaction).where(
+                    Transaction.user_id == current_user.id,
+                    Transaction.source == 'gmail'
+                )
+            )
+            removed_count = delete_result.rowcount
             
             print(f"🗑️ Removed {removed_count} existing sample transactions")
             
-            # Process sample emails using NLP processor
-            processed_count = 0
+            # Process sample emails using the regex extractor
+            rows = []
             skipped_count = 0
             
-            # Generate dates across last 6 months for realistic trends
-            base_date = datetime.now() - timedelta(days=180)  # 6 months ago
+            # Generate dates across last 6 months for realistic trends (clock read once)
+            now = datetime.now()
+            base_date = now - timedelta(days=180)  # 6 months ago
             
             # Select 25-30 random email samples (including some malformed ones)
-            selected_emails = random.sample(sample_email_texts, min(30, len(sample_email_texts)))
+            selected_emails = random.sample(SAMPLE_EMAIL_TEXTS, min(30, len(SAMPLE_EMAIL_TEXTS)))
+            
+            # Generate weighted random dates for all emails in one vectorized pass
+            # More recent dates are more likely; times vary from 6 AM to 10 PM
+            rng = np.random.default_rng()
+            sample_size = len(selected_emails)
+            day_offsets = rng.choice(len(SAMPLE_DATE_PROBABILITIES), size=sample_size, p=SAMPLE_DATE_PROBABILITIES)
+            second_offsets = (
+                day_offsets * 86400
+                + rng.integers(6, 23, size=sample_size) * 3600
+                + rng.integers(0, 60, size=sample_size) * 60
+                + rng.integers(0, 60, size=sample_size)
+            )
+            transaction_dates = [base_date + timedelta(seconds=int(offset)) for offset in second_offsets]
             
-            print(f"\n📧 Processing {len(selected_emails)} sample emails through NLP processor...")
-            print(f"📅 Date range: {base_date.strftime('%d %b %Y')} to {datetime.now().strftime('%d %b %Y')}")
+            # Preload the user's remaining (amount, date) pairs near the sample dates once instead of querying per transaction
+            existing_dates_by_amount = defaultdict(list)
+            if transaction_dates:
+                for amount, date in db.session.query(Transaction.amount, Transaction.date)\
+                        .filter(Transaction.user_id == current_user.id)\
+                        .filter(Transaction.date.between(min(transaction_dates) - DUPLICATE_WINDOW,
+                                                         max(transaction_dates) + DUPLICATE_WINDOW)):
+                    existing_dates_by_amount[round(float(amount), 2)].append(date)
             
-            # Create transaction date distribution for better trends
-            # More transactions in recent months, varied throughout the week
-            date_weights = []
-            for day_offset in range(180):
-                # Recent months get more weight (more transactions)
-                weight = 1 + (day_offset / 30)  # Increases over time
-                date_weights.append(weight)
+            print(f"\n📧 Processing {len(selected_emails)} sample emails through regex extractor...")
+            print(f"📅 Date range: {base_date.strftime('%d %b %Y')} to {now.strftime('%d %b %Y')}")
             
             for i, email_text in enumerate(selected_emails, 1):
                 print(f"\n--- Processing Sample Email {i}/{len(selected_emails)} ---")
                 print(f"📄 Email text: {email_text[:100]}...")
                 
-                # Use NLP processor to extract transaction details
+                # Sample alerts are rigidly formatted, so use the regex fast path instead of the NLP processor
                 try:
-                    transactions_data = processor.process_text(email_text)
+                    trans_data = sms_regex_extractor.extract(email_text, transaction_processor.category_keywords)
+                    transactions_data = [trans_data] if trans_data else []
                     
                     if not transactions_data:
-                        print(f"⚠️ NLP Processor: No transactions found in email {i}")
+                        print(f"⚠️ Regex Extractor: No transactions found in email {i}")
                         skipped_count += 1
                         continue
                     
                     # Process each transaction found in the email
                     for trans_data in transactions_data:
-                        # Generate weighted random date for realistic distribution
-                        # More recent dates are more likely
-                        random_days = random.choices(range(180), weights=date_weights, k=1)[0]
-                        
-                        # Generate transaction date with varied times
-                        transaction_date = base_date + timedelta(
-                            days=random_days, 
-                            hours=random.randint(6, 22),  # 6 AM to 10 PM
-                            minutes=random.randint(0, 59),
-                            seconds=random.randint(0, 59)
-                        )
+                        # Use the pre-generated date for this email
+                        transaction_date = transaction_dates[i - 1]
                         
                         # DON'T use parsed date from email - use our generated date for variety
                         # This ensures transactions are spread across 6 months
                         
                         print(f"📅 Generated date: {transaction_date.strftime('%d %b %Y')}")
                         
-                        # Check for duplicates
-                        existing = Transaction.query.filter(
-                            Transaction.user_id == current_user.id,
-                            Transaction.amount == trans_data['amount'],
-                            Transaction.date >= transaction_date - timedelta(minutes=5),
-                            Transaction.date <= transaction_date + timedelta(minutes=5)
-                        ).first()
-                        
-                        if existing:
+                        # Check for duplicates (same amount within the duplicate window)
+                        amount_key = round(float(trans_data['amount']), 2)
+                        if _is_duplicate(existing_dates_by_amount, amount_key, transaction_date):
                             print(f"⏭️ Skipping duplicate: ₹{trans_data['amount']}")
                             skipped_count += 1
                             continue
+                        existing_dates_by_amount[amount_key].append(transaction_date)
                         
                         # Create transaction
-                        transaction = Transaction(
-                            user_id=current_user.id,
-                            amount=trans_data['amount'],
-                            description=trans_data.get('description', 'Sample transaction'),
-                            date=transaction_date,
-                            category_id=trans_data.get('category_id'),
-                            merchant=trans_data.get('merchant', ''),
-                            transaction_type=trans_data.get('transaction_type', 'debit'),
-                            source='gmail',
-                            gmail_message_id=f'sample_msg_{i}_{current_user.id}_{processed_count}',
-                            raw_text=email_text[:500],  # Store original email text
-                            confidence_score=trans_data.get('confidence', 0.85)
-                        )
-                        
-                        db.session.add(transaction)
-                        processed_count += 1
+                        rows.append({
+                            'user_id': current_user.id,
+                            'amount': trans_data['amount'],
+                            'description': trans_data.get('description', 'Sample transaction'),
+                            'date': transaction_date,
+                            'category_id': get_category_id_from_name(trans_data.get('category')),
+                            'merchant': trans_data.get('merchant', ''),
+                            'transaction_type': trans_data.get('type', 'debit'),
+                            'source': 'gmail',
+                            'gmail_message_id': f'sample_msg_{i}_{current_user.id}_{len(rows)}',
+                            'raw_text': email_text[:500],  # Store original email text
+                            'confidence_score': trans_data.get('confidence', 0.85)
+                        })
                         print(f"✅ Added: ₹{trans_data['amount']} - {trans_data.get('description', 'N/A')[:50]} (Confidence: {trans_data.get('confidence', 0.85):.2f})")
                 
                 except Exception as e:
@@ -695,7 +789,10 @@ def sync_gmail():
                     skipped_count += 1
                     continue
             
+            _bulk_insert_transactions(rows)
             db.session.commit()
+            invalidate_user_cache(current_user.id)
+            processed_count = len(rows)
             
             print(f"\n{'='*60}")
             print(f"📊 SAMPLE DATA PROCESSING COMPLETE:")
@@ -720,6 +817,14 @@ def sync_gmail():
     except Exception as e:
         return jsonify({'error': f'Sync failed: {str(e)}'}), 500
 
+def _conditional_json(payload):
+    """jsonify with a content ETag so unchanged polls are answered with 304 Not Modified"""
+    response = jsonify(payload)
+    response.add_etag(weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # Always revalidate - the mode can be changed with a POST
+    return response.make_conditional(request)
+
 @app.route('/api/gmail/status')
 @login_required
 def gmail_status():
@@ -728,7 +833,7 @@ def gmail_status():
     
     if current_mode == 'gmail':
         if not GMAIL_INTEGRATION_AVAILABLE:
-            return jsonify({
+            return _conditional_json({
                 'available': False,
                 'authenticated': False,
                 'mode': 'gmail',
@@ -737,16 +842,16 @@ def gmail_status():
             })
         
         # Check if Gmail is authenticated
-        gmail_service = GmailService()
+        gmail_service = get_gmail_service()
         
-        return jsonify({
+        return _conditional_json({
             'available': GMAIL_INTEGRATION_AVAILABLE,
             'authenticated': gmail_service.authenticated,
             'mode': 'gmail',
             'message': 'Gmail integration active' if gmail_service.authenticated else 'Gmail authentication required - visit /gmail-setup'
         })
     else:
-        return jsonify({
+        return _conditional_json({
             'available': True,
             'authenticated': True,
             'mode': 'sample',
@@ -774,7 +879,7 @@ def data_source_mode():
     
     # GET request - return current mode
     current_mode = app.config['DATA_SOURCE_MODE']
-    return jsonify({
+    return _conditional_json({
         'mode': current_mode,
         'description': 'Sample data' if current_mode == 'sample' else 'Real Gmail integration',
         'options': ['sample', 'gmail']
@@ -789,20 +894,27 @@ def gmail_debug():
         gmail_count = Transaction.query.filter_by(user_id=current_user.id, source='gmail').count()
         total_count = Transaction.query.filter_by(user_id=current_user.id).count()
         
-        # Get recent Gmail transactions
-        recent_gmail = Transaction.query.filter_by(
-            user_id=current_user.id,
-            source='gmail'
-        ).order_by(Transaction.date.desc()).limit(5).all()
+        # Get recent Gmail transactions with their category names in one joined query
+        recent_gmail = db.session.query(
+            Transaction.amount,
+            Transaction.description,
+            Transaction.date,
+            Transaction.merchant,
+            Category.name
+        ).outerjoin(Category, Transaction.category_id == Category.id)\
+         .filter(Transaction.user_id == current_user.id, Transaction.source == 'gmail')\
+         .order_by(Transaction.date.desc())\
+         .limit(5)\
+         .all()
         
         recent_list = []
-        for t in recent_gmail:
+        for amount, description, date, merchant, category_name in recent_gmail:
             recent_list.append({
-                'amount': float(t.amount),
-                'description': t.description,
-                'date': t.date.isoformat(),
-                'merchant': t.merchant,
-                'category': t.category.name if t.category else 'Unknown'
+                'amount': float(amount),
+                'description': description,
+                'date': date.isoformat(),
+                'merchant': merchant,
+                'category': category_name or 'Unknown'
             })
         
         return jsonify({
@@ -819,113 +931,53 @@ def gmail_debug():
 def force_gmail_refresh():
     """Force refresh with fresh sample data by removing existing transactions and adding new ones"""
     try:
-        # Remove all Gmail transactions for this user
-        gmail_transactions = Transaction.query.filter_by(
+        # Remove all Gmail transactions for this user with a single DELETE
+        removed_count = Transaction.query.filter_by(
             user_id=current_user.id,
             source='gmail'
-        ).all()
-        
-        removed_count = len(gmail_transactions)
-        for transaction in gmail_transactions:
-            db.session.delete(transaction)
+        ).delete(synchronize_session=False)
         
         db.session.commit()
         print(f"Removed {removed_count} existing Gmail transactions")
         
         # Same sample transaction logic as sync_gmail
-        from datetime import datetime, timedelta
-        import random
-        
-        # Extended sample transaction templates for force refresh
-        sample_transactions = [
-            # Groceries
-            {'amount': 1450.25, 'description': 'More Megastore - Fresh produce and essentials', 'merchant': 'More Megastore', 'category': 'groceries', 'type': 'debit'},
-            {'amount': 980.50, 'description': 'Spencer\'s Retail - Weekly grocery haul', 'merchant': 'Spencer\'s', 'category': 'groceries', 'type': 'debit'},
-            {'amount': 2300.75, 'description': 'Nature\'s Basket - Organic food shopping', 'merchant': 'Nature\'s Basket', 'category': 'groceries', 'type': 'debit'},
-            {'amount': 650.00, 'description': 'Local Kirana Store - Daily essentials', 'merchant': 'Kirana Store', 'category': 'groceries', 'type': 'debit'},
-            
-            # Dining & Food
-            {'amount': 520.00, 'description': 'Cafe Coffee Day - Coffee and pastry', 'merchant': 'CCD', 'category': 'dining', 'type': 'debit'},
-            {'amount': 1450.00, 'description': 'Dominos Pizza - Large pizza order', 'merchant': 'Dominos', 'category': 'dining', 'type': 'debit'},
-            {'amount': 380.00, 'description': 'Subway - Healthy lunch combo', 'merchant': 'Subway', 'category': 'dining', 'type': 'debit'},
-            {'amount': 920.00, 'description': 'Zomato Gold - Premium restaurant meal', 'merchant': 'Zomato', 'category': 'dining', 'type': 'debit'},
-            {'amount': 280.00, 'description': 'Tea Post - Evening snacks', 'merchant': 'Tea Post', 'category': 'dining', 'type': 'debit'},
-            
-            # Transportation
-            {'amount': 320.00, 'description': 'Ola Auto - Short distance ride', 'merchant': 'Ola', 'category': 'transportation', 'type': 'debit'},
-            {'amount': 180.00, 'description': 'Metro Card Recharge - Monthly pass', 'merchant': 'Metro', 'category': 'transportation', 'type': 'debit'},
-            {'amount': 2800.00, 'description': 'Indian Oil - Full tank fuel', 'merchant': 'Indian Oil', 'category': 'transportation', 'type': 'debit'},
-            {'amount': 450.00, 'description': 'Rapid Metro - Airport express', 'merchant': 'Rapid Metro', 'category': 'transportation', 'type': 'debit'},
-            
-            # Shopping & E-commerce
-            {'amount': 4200.00, 'description': 'Amazon Prime - Electronics and gadgets', 'merchant': 'Amazon', 'category': 'shopping', 'type': 'debit'},
-            {'amount': 2100.00, 'description': 'Myntra End of Season Sale - Fashion haul', 'merchant': 'Myntra', 'category': 'shopping', 'type': 'debit'},
-            {'amount': 1650.00, 'description': 'Nykaa Beauty - Cosmetics and skincare', 'merchant': 'Nykaa', 'category': 'shopping', 'type': 'debit'},
-            {'amount': 2900.00, 'description': 'Flipkart Big Billion Days - Home appliances', 'merchant': 'Flipkart', 'category': 'shopping', 'type': 'debit'},
-            {'amount': 850.00, 'description': 'Ajio Fashion - Trendy clothing', 'merchant': 'Ajio', 'category': 'shopping', 'type': 'debit'},
-            
-            # Entertainment
-            {'amount': 600.00, 'description': 'PVR Cinemas - Movie tickets for 2', 'merchant': 'PVR', 'category': 'entertainment', 'type': 'debit'},
-            {'amount': 399.00, 'description': 'Disney+ Hotstar - Annual subscription', 'merchant': 'Disney+ Hotstar', 'category': 'entertainment', 'type': 'debit'},
-            {'amount': 299.00, 'description': 'Amazon Prime Video - Monthly plan', 'merchant': 'Prime Video', 'category': 'entertainment', 'type': 'debit'},
-            {'amount': 750.00, 'description': 'GameStop - Video game purchase', 'merchant': 'GameStop', 'category': 'entertainment', 'type': 'debit'},
-            
-            # Utilities & Bills
-            {'amount': 3200.00, 'description': 'BSES Delhi - Electricity bill payment', 'merchant': 'BSES', 'category': 'utilities', 'type': 'debit'},
-            {'amount': 1450.00, 'description': 'JioFiber - High-speed internet monthly', 'merchant': 'JioFiber', 'category': 'utilities', 'type': 'debit'},
-            {'amount': 599.00, 'description': 'Vi Postpaid - Mobile bill payment', 'merchant': 'Vi', 'category': 'utilities', 'type': 'debit'},
-            {'amount': 850.00, 'description': 'Indraprastha Gas - Cooking gas refill', 'merchant': 'IGL', 'category': 'utilities', 'type': 'debit'},
-            
-            # Healthcare
-            {'amount': 1200.00, 'description': 'MedPlus Pharmacy - Prescription medicines', 'merchant': 'MedPlus', 'category': 'healthcare', 'type': 'debit'},
-            {'amount': 2500.00, 'description': 'Max Healthcare - Specialist consultation', 'merchant': 'Max Hospital', 'category': 'healthcare', 'type': 'debit'},
-            {'amount': 450.00, 'description': '1mg Online Pharmacy - Health supplements', 'merchant': '1mg', 'category': 'healthcare', 'type': 'debit'},
-            
-            # Bills & Financial
-            {'amount': 18500.00, 'description': 'ICICI Credit Card - Monthly payment', 'merchant': 'ICICI Bank', 'category': 'bills', 'type': 'debit'},
-            {'amount': 32000.00, 'description': 'HDFC Home Loan - EMI payment', 'merchant': 'HDFC Bank', 'category': 'bills', 'type': 'debit'},
-            {'amount': 5500.00, 'description': 'LIC Premium - Life insurance payment', 'merchant': 'LIC', 'category': 'bills', 'type': 'debit'},
-            
-            # Income/Credits
-            {'amount': 85000.00, 'description': 'Salary Credit - Monthly compensation', 'merchant': 'Employer', 'category': 'other', 'type': 'credit'},
-            {'amount': 8500.00, 'description': 'Freelance Project - Web development work', 'merchant': 'Client', 'category': 'other', 'type': 'credit'},
-            {'amount': 2200.00, 'description': 'Investment Returns - Mutual fund dividend', 'merchant': 'SBI Mutual Fund', 'category': 'other', 'type': 'credit'},
-            {'amount': 1200.00, 'description': 'Cashback Credit - Credit card rewards', 'merchant': 'HDFC Rewards', 'category': 'other', 'type': 'credit'},
-        ]
-        
         # Add sample transactions with random dates in the last 60 days
-        processed_count = 0
+        rows = []
         base_date = datetime.now() - timedelta(days=60)
         
         # Select 25-30 random transactions for force refresh
-        selected_transactions = random.sample(sample_transactions, min(30, len(sample_transactions)))
-        
-        for i, trans_data in enumerate(selected_transactions):
-            # Generate random date in the last 60 days
-            random_days = random.randint(0, 60)
-            transaction_date = base_date + timedelta(days=random_days, hours=random.randint(8, 20), minutes=random.randint(0, 59))
-            
-            # Get category ID from category name
-            category_id = get_category_id_from_name(trans_data.get('category'))
-            
-            transaction = Transaction(
-                user_id=current_user.id,
-                amount=trans_data['amount'],
-                description=trans_data['description'],
-                date=transaction_date,
-                category_id=category_id,
-                merchant=trans_data.get('merchant', ''),
-                transaction_type=trans_data.get('type', 'debit'),
-                source='gmail',  # Mark as Gmail source for consistency
-                gmail_message_id=f'refresh_sample_{i}_{current_user.id}',  # Unique refresh sample ID
-                raw_text=f"Force refresh sample: {trans_data['description']}",
-                confidence_score=0.98  # Very high confidence for sample data
-            )
-            db.session.add(transaction)
-            processed_count += 1
+        selected_transactions = random.sample(REFRESH_SAMPLE_TRANSACTIONS, min(30, len(REFRESH_SAMPLE_TRANSACTIONS)))
+        
+        # Generate all random dates (8 AM to 8 PM) in one vectorized pass
+        rng = np.random.default_rng()
+        sample_size = len(selected_transactions)
+        second_offsets = (
+            rng.integers(0, 61, size=sample_size) * 86400
+            + rng.integers(8, 21, size=sample_size) * 3600
+            + rng.integers(0, 60, size=sample_size) * 60
+        )
+        transaction_dates = [base_date + timedelta(seconds=int(offset)) for offset in second_offsets]
+        
+        for i, (trans_data, transaction_date) in enumerate(zip(selected_transactions, transaction_dates)):
+            rows.append({
+                'user_id': current_user.id,
+                'amount': trans_data['amount'],
+                'description': trans_data['description'],
+                'date': transaction_date,
+                'category_id': get_category_id_from_name(trans_data.get('category')),
+                'merchant': trans_data.get('merchant', ''),
+                'transaction_type': trans_data.get('type', 'debit'),
+                'source': 'gmail',  # Mark as Gmail source for consistency
+                'gmail_message_id': f'refresh_sample_{i}_{current_user.id}',  # Unique refresh sample ID
+                'raw_text': f"Force refresh sample: {trans_data['description']}",
+                'confidence_score': 0.98  # Very high confidence for sample data
+            })
             print(f"✅ Added fresh sample transaction: ₹{trans_data['amount']} - {trans_data['description']}")
         
+        _bulk_insert_transactions(rows)
         db.session.commit()
+        invalidate_user_cache(current_user.id)
+        processed_count = len(rows)
         
         message = f'Force refresh completed! Removed {removed_count} old transactions, Added {processed_count} fresh sample transactions'
         
@@ -947,16 +999,15 @@ def test_gmail_search():
         return jsonify({'error': 'Gmail integration not available'}), 400
     
     try:
-        from datetime import datetime, timedelta
-        
-        gmail_service = GmailService()
+        gmail_service = get_gmail_service()
         
         if not gmail_service.authenticated:
             return jsonify({'error': 'Gmail not authenticated'}), 401
         
         # Test date calculation
         days_back = 30
-        start_date = datetime.now() - timedelta(days=days_back)
+        now = datetime.now()
+        start_date = now - timedelta(days=days_back)
         query_date = start_date.strftime('%Y/%m/%d')
         
         # Test basic search
@@ -971,7 +1022,7 @@ def test_gmail_search():
         messages = results.get('messages', [])
         
         debug_info = {
-            'current_date': datetime.now().strftime('%Y/%m/%d'),
+            'current_date': now.strftime('%Y/%m/%d'),
             'days_back': days_back,
             'calculated_start_date': query_date,
             'test_query': test_query,
@@ -1004,8 +1055,8 @@ def list_gmail_accounts():
         return jsonify({'error': 'Gmail integration not available'}), 400
     
     try:
-        multi_gmail = MultiAccountGmailService()
-        accounts = multi_gmail.list_accounts()
+        with use_multi_gmail_service(current_user.id) as multi_gmail:
+            accounts = multi_gmail.list_accounts()
         return jsonify({'accounts': accounts})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1021,10 +1072,11 @@ def add_gmail_account():
         data = request.get_json()
         account_name = data.get('account_name', f'account_{datetime.now().strftime("%Y%m%d_%H%M%S")}')
         
-        multi_gmail = MultiAccountGmailService()
-        
-        if multi_gmail.add_account(account_name):
+        with use_multi_gmail_service(current_user.id) as multi_gmail:
+            added = multi_gmail.add_account(account_name)
             accounts = multi_gmail.list_accounts()
+        
+        if added:
             return jsonify({
                 'message': f'Account {account_name} added successfully',
                 'accounts': accounts
@@ -1043,9 +1095,10 @@ def switch_gmail_account(account_name):
         return jsonify({'error': 'Gmail integration not available'}), 400
     
     try:
-        multi_gmail = MultiAccountGmailService()
+        with use_multi_gmail_service(current_user.id) as multi_gmail:
+            switched = multi_gmail.switch_account(account_name)
         
-        if multi_gmail.switch_account(account_name):
+        if switched:
             return jsonify({'message': f'Switched to account {account_name}'})
         else:
             return jsonify({'error': 'Account not found'}), 404
@@ -1053,6 +1106,14 @@ def switch_gmail_account(account_name):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _parse_email_transactions(email):
+    """Parse one email's body, returning no transactions if it is malformed or the parser fails"""
+    try:
+        return transaction_processor.process_text(email['body'])
+    except Exception as e:
+        print(f"Error processing email: {e}")
+        return []
+
 @app.route('/api/gmail/sync-all', methods=['POST'])
 @login_required
 def sync_all_gmail_accounts():
@@ -1064,77 +1125,78 @@ def sync_all_gmail_accounts():
         data = request.get_json() if request.is_json else {}
         days_back = data.get('days_back', 7)
         
-        multi_gmail = MultiAccountGmailService()
-        
-        # Load existing accounts
-        if os.path.exists('gmail_token.pickle'):
-            multi_gmail.add_account('primary')
-        
-        all_transactions = multi_gmail.sync_all_accounts(days_back=days_back)
+        with use_multi_gmail_service(current_user.id) as multi_gmail:
+            # Load the primary account once; later requests reuse it
+            if 'primary' not in multi_gmail.accounts and os.path.exists('gmail_token.pickle'):
+                multi_gmail.add_account('primary')
+            
+            # Each account's client is used by exactly one of sync_all_accounts' worker threads
+            all_transactions = multi_gmail.sync_all_accounts(days_back=days_back)
         
-        total_processed = 0
+        rows = []
         total_skipped = 0
         
+        # Look up which fetched Gmail messages were already processed in one IN query
+        fetched_ids = [email.get('id') for account_data in all_transactions.values()
+                       for email in account_data['transactions'] if email.get('id')]
+        seen_ids = {
+            message_id for (message_id,) in db.session.query(Transaction.gmail_message_id)
+            .filter(Transaction.user_id == current_user.id)
+            .filter(Transaction.gmail_message_id.isnot(None))  # lets the planner use the partial index
+            .filter(Transaction.gmail_message_id.in_(fetched_ids))
+            .filter(Transaction.source.like('gmail_%'))
+        } if fetched_ids else set()
+        
+        # Skip Gmail messages we already processed
+        new_emails = []
         for account_name, account_data in all_transactions.items():
-            transactions = account_data['transactions']
-            
-            for email in transactions:
-                try:
-                    # First check if we already processed this Gmail message
-                    existing_by_gmail_id = Transaction.query.filter_by(
-                        user_id=current_user.id,
-                        gmail_message_id=email.get('id')
-                    ).filter(
-                        Transaction.source.like('gmail_%')
-                    ).first()
-                    
-                    if existing_by_gmail_id:
-                        total_skipped += 1
-                        continue  # Skip already processed email
-                    
-                    # Process email body text
-                    transactions_data = transaction_processor.process_text(email['body'])
+            for email in account_data['transactions']:
+                if email.get('id') in seen_ids:
+                    total_skipped += 1
+                else:
+                    new_emails.append((account_name, email))
+        
+        # Phase 1: parse all new email bodies up front (a bad email is skipped, not fatal to the sync)
+        parsed_emails = [_parse_email_transactions(email) for _, email in new_emails]
+        duplicate_index = _load_duplicate_index(current_user.id, parsed_emails)
+        
+        # Phase 2: duplicate checks and row building against the preloaded index
+        for (account_name, email), transactions_data in zip(new_emails, parsed_emails):
+            try:
+                for trans_data in transactions_data:
+                    # Double check: also look for duplicates by amount, date and partial description
+                    duplicate_key = _duplicate_key(trans_data['amount'], trans_data.get('type', 'debit'),
+                                                   description_prefix_hash(trans_data['description']))
                     
-                    for trans_data in transactions_data:
-                        # Double check: also look for duplicates by amount, date and partial description
-                        description_start = trans_data['description'][:100]  # First 100 chars
-                        existing = Transaction.query.filter_by(
-                            user_id=current_user.id,
-                            amount=trans_data['amount'],
-                            transaction_type=trans_data.get('type', 'debit')
-                        ).filter(
-                            Transaction.date >= trans_data['date'] - timedelta(minutes=5),
-                            Transaction.date <= trans_data['date'] + timedelta(minutes=5)
-                        ).filter(
-                            Transaction.description.like(f"{description_start}%")
-                        ).first()
+                    if not _is_duplicate(duplicate_index, duplicate_key, trans_data['date']):
+                        duplicate_index[duplicate_key].append(trans_data['date'])
                         
-                        if not existing:
-                            # Get category ID from category name
-                            category_id = get_category_id_from_name(trans_data.get('category'))
-                            
-                            transaction = Transaction(
-                                user_id=current_user.id,
-                                amount=trans_data['amount'],
-                                description=trans_data['description'],
-                                date=trans_data['date'],
-                                category_id=category_id,
-                                merchant=trans_data.get('merchant', ''),
-                                transaction_type=trans_data.get('type', 'debit'),
-                                source=f'gmail_{account_name}',
-                                gmail_message_id=email.get('id'),  # Store Gmail message ID
-                                raw_text=email['body'][:1000]  # Store first 1000 chars of original email
-                            )
-                            db.session.add(transaction)
-                            total_processed += 1
-                        else:
-                            total_skipped += 1
-                
-                except Exception as e:
-                    print(f"Error processing email: {e}")
-                    continue
+                        # Get category ID from category name
+                        category_id = get_category_id_from_name(trans_data.get('category'))
+                        
+                        rows.append({
+                            'user_id': current_user.id,
+                            'amount': trans_data['amount'],
+                            'description': trans_data['description'],
+                            'date': trans_data['date'],
+                            'category_id': category_id,
+                            'merchant': trans_data.get('merchant', ''),
+                            'transaction_type': trans_data.get('type', 'debit'),
+                            'source': f'gmail_{account_name}',
+                            'gmail_message_id': email.get('id'),  # Store Gmail message ID
+                            'raw_text': email['body'][:1000]  # Store first 1000 chars of original email
+                        })
+                    else:
+                        total_skipped += 1
+            
+            except Exception as e:
+                print(f"Error processing email: {e}")
+                continue
         
+        _bulk_insert_transactions(rows)
         db.session.commit()
+        invalidate_user_cache(current_user.id)
+        total_processed = len(rows)
         
         if total_processed == 0 and total_skipped > 0:
             message = f'No new transactions to sync. {total_skipped} transactions were already processed from all accounts.'
@@ -1153,6 +1215,17 @@ def sync_all_gmail_accounts():
     except Exception as e:
         return jsonify({'error': f'Multi-account sync failed: {str(e)}'}), 500
 
+# Sender and body hints used by the Gmail debug view, each matched in one compiled pass
+FINANCIAL_SENDER_PATTERN = re.compile(
+    '|'.join(map(re.escape, ('bank', 'sbi', 'hdfc', 'icici', 'axis', 'kotak', 'citi',
+                             'paytm', 'phonepe', 'gpay', 'credit', 'debit', 'wallet'))),
+    re.IGNORECASE
+)
+TRANSACTION_TERM_PATTERN = re.compile(
+    '|'.join(map(re.escape, ('debited', 'credited', 'transaction', 'payment', 'purchase', 'rs.', '₹', 'amount'))),
+    re.IGNORECASE
+)
+
 @app.route('/api/gmail/debug', methods=['POST'])
 @login_required
 def debug_gmail():
@@ -1166,7 +1239,7 @@ def debug_gmail():
         max_results = data.get('max_results', 20)
         strict_mode = data.get('strict_mode', True)  # Only financial senders by default
         
-        gmail_service = GmailService()
+        gmail_service = get_gmail_service()
         
         if not gmail_service.authenticated:
             return jsonify({'error': 'Gmail not authenticated'}), 400
@@ -1177,23 +1250,19 @@ def debug_gmail():
         # Return detailed email information for debugging
         debug_info = []
         for email in emails:
-            sender = email.get('sender', 'Unknown Sender').lower()
+            sender = email.get('sender', 'Unknown Sender')
             subject = email.get('subject', 'No Subject')
             body = email.get('body', '')
             
             # Check if sender is financial
-            is_financial_sender = any(domain in sender for domain in [
-                'bank', 'sbi', 'hdfc', 'icici', 'axis', 'kotak', 'citi', 
-                'paytm', 'phonepe', 'gpay', 'credit', 'debit', 'wallet'
-            ])
+            is_financial_sender = bool(FINANCIAL_SENDER_PATTERN.search(sender))
             
             # Check for transaction indicators
-            has_transaction_terms = any(keyword in (body + subject).lower() 
-                                      for keyword in ['debited', 'credited', 'transaction', 'payment', 'purchase', 'rs.', '₹', 'amount'])
+            has_transaction_terms = bool(TRANSACTION_TERM_PATTERN.search(body) or TRANSACTION_TERM_PATTERN.search(subject))
             
             debug_info.append({
                 'subject': subject,
-                'sender': email.get('sender', 'Unknown Sender'),
+                'sender': sender,
                 'date': email.get('raw_date', 'Unknown Date'),
                 'body_preview': body[:200] + '...' if len(body) > 200 else body,
                 'is_financial_sender': is_financial_sender,
@@ -1215,24 +1284,47 @@ def debug_gmail():
 @app.route('/api/transactions')
 @login_required
 def api_transactions():
-    transactions = Transaction.query.filter_by(user_id=current_user.id)\
-                                  .order_by(Transaction.date.desc()).all()
-    
-    return jsonify([{
-        'id': t.id,
-        'amount': t.amount,
-        'description': t.description,
-        'date': t.date.isoformat(),
-        'category': t.category.name if t.category else 'Uncategorized',
-        'merchant': t.merchant,
-        'type': t.transaction_type
-    } for t in transactions])
+    # Fetch plain column tuples in batches instead of materializing every ORM object
+    result = db.session.execute(
+        db.select(
+            Transaction.id,
+            Transaction.amount,
+            Transaction.description,
+            Transaction.date,
+            Category.name,
+            Transaction.merchant,
+            Transaction.transaction_type
+        ).outerjoin(Category, Transaction.category_id == Category.id)
+         .where(Transaction.user_id == current_user.id)
+         .order_by(Transaction.date.desc())
+         .execution_options(yield_per=500)
+    )
+    
+    def generate():
+        """Stream the JSON array one 500-row batch at a time, encoding each batch in a single call"""
+        yield '['
+        first = True
+        for partition in result.partitions():
+            # Encode the batch as an array and drop its brackets so batches join into one array
+            chunk = app.json.dumps([{
+                'id': transaction_id,
+                'amount': amount,
+                'description': description,
+                'date': date.isoformat(),
+                'category': category_name or 'Uncategorized',
+                'merchant': merchant,
+                'type': transaction_type
+            } for transaction_id, amount, description, date, category_name, merchant, transaction_type in partition])[1:-1]
+            yield chunk if first else f',{chunk}'
+            first = False
+        yield ']'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/api/spending-chart')
 @login_required
 def api_spending_chart():
     """Get spending data for different time periods: 6days, 30days, or 6months"""
-    from datetime import datetime, timedelta
     
     # Get period parameter (default: 6days)
     period = request.args.get('period', '6days')
@@ -1243,41 +1335,42 @@ def api_spending_chart():
     if period == '6days':
         start_date = end_date - timedelta(days=6)
         date_format = '%Y-%m-%d'  # Daily format
-        group_by_format = '%Y-%m-%d'
         label_format = '%d %b'  # "25 Nov"
     elif period == '7days':
         start_date = end_date - timedelta(days=7)
         date_format = '%Y-%m-%d'  # Daily format
-        group_by_format = '%Y-%m-%d'
         label_format = '%d %b'  # "25 Nov"
     elif period == '30days':
         start_date = end_date - timedelta(days=30)
         date_format = '%Y-%m-%d'  # Daily format
-        group_by_format = '%Y-%m-%d'
         label_format = '%d %b'  # "25 Nov"
     elif period == '6months':
         start_date = end_date - timedelta(days=180)
         date_format = '%Y-%m'  # Monthly format
-        group_by_format = '%Y-%m'
         label_format = '%b %Y'  # "Nov 2024"
     else:
         # Default to 7 days
         start_date = end_date - timedelta(days=6)
         date_format = '%Y-%m-%d'
-        group_by_format = '%Y-%m-%d'
         label_format = '%d %b'
     
+    # Group monthly periods on the stored integer YYYYMM bucket and daily periods on date()
+    if period == '6months':
+        period_key = Transaction.year_month
+    else:
+        period_key = db.func.date(Transaction.date)
+    
     # Query spending data grouped by the appropriate time period
     spending_data = db.session.query(
-        db.func.strftime(group_by_format, Transaction.date).label('period'),
+        period_key.label('period'),
         db.func.sum(Transaction.amount).label('total')
     ).filter(
         Transaction.user_id == current_user.id,
         Transaction.transaction_type == 'debit',
         Transaction.date >= start_date,
         Transaction.date <= end_date
-    ).group_by(db.func.strftime(group_by_format, Transaction.date))\
-     .order_by('period').all()
+    ).group_by(period_key)\
+     .order_by(period_key).all()
     
     # Format labels for display
     labels = []
@@ -1286,17 +1379,18 @@ def api_spending_chart():
     for item in spending_data:
         try:
             if period == '6months':
-                # Parse "YYYY-MM" format
-                date_obj = datetime.strptime(item.period, '%Y-%m')
+                # Split the integer YYYYMM bucket
+                date_obj = datetime(item.period // 100, item.period % 100, 1)
                 labels.append(date_obj.strftime(label_format))
             else:
-                # Parse "YYYY-MM-DD" format
-                date_obj = datetime.strptime(item.period, '%Y-%m-%d')
+                # Slice the fixed "YYYY-MM-DD" date() string rather than running strptime
+                day = item.period
+                date_obj = datetime(int(day[:4]), int(day[5:7]), int(day[8:10]))
                 labels.append(date_obj.strftime(label_format))
             amounts.append(float(item.total))
         except Exception as e:
             print(f"Error formatting date {item.period}: {e}")
-            labels.append(item.period)
+            labels.append(str(item.period))
             amounts.append(float(item.total))
     
     return jsonify({
@@ -1311,84 +1405,152 @@ def api_spending_chart():
 @app.route('/api/category-chart')
 @login_required
 def api_category_chart():
-    # Get category breakdown
-    category_data = db.session.query(
-        Category.name,
-        db.func.sum(Transaction.amount).label('total')
-    ).join(Transaction)\
-     .filter(Transaction.user_id == current_user.id)\
-     .filter(Transaction.transaction_type == 'debit')\
-     .group_by(Category.name).all()
+    cache_key = (current_user.id, 'category_chart', _transactions_version(current_user.id))
+    chart = _cache_get(cache_key)
+    if chart is None:
+        # Get category breakdown, cast to float in SQL so the rows can be split without per-item coercion
+        category_data = db.session.query(
+            Category.name,
+            db.cast(db.func.sum(Transaction.amount), db.Float).label('total')
+        ).join(Transaction)\
+         .filter(Transaction.user_id == current_user.id)\
+         .filter(Transaction.transaction_type == 'debit')\
+         .group_by(Category.name).all()
+        
+        categories, amounts = zip(*category_data) if category_data else ((), ())
+        chart = {
+            'categories': list(categories),
+            'amounts': list(amounts)
+        }
+        _cache_set(cache_key, chart)
     
-    return jsonify({
-        'categories': [item.name for item in category_data],
-        'amounts': [float(item.total) for item in category_data]
-    })
+    return jsonify(chart)
 
 @app.route('/api/analytics/insights')
 @login_required
 def api_analytics_insights():
+    """Serve personalized insights, recomputing only when the user's transactions changed or the cache expired"""
+    cache_key = (current_user.id, 'insights', _transactions_version(current_user.id))
+    insights = _cache_get(cache_key)
+    if insights is None:
+        insights = _generate_insights()
+        _cache_set(cache_key, insights)
+    
+    return jsonify({'insights': insights})
+
+def _generate_insights():
     """Generate PERSONALIZED AI-powered insights based on user's actual spending patterns"""
-    from datetime import datetime, timedelta
-    from collections import defaultdict
     
     insights = []
     
-    # Get transactions from last 30 days for current analysis
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_transactions = Transaction.query.filter_by(user_id=current_user.id)\
-                                          .filter(Transaction.date >= thirty_days_ago)\
-                                          .all()
+    # Analysis windows: last 30 days, compared against the 30 days before that
+    now = datetime.now()
+    thirty_days_ago = now - timedelta(days=30)
+    sixty_days_ago = now - timedelta(days=60)
+    
+    is_debit = Transaction.transaction_type == 'debit'
+    is_credit = Transaction.transaction_type == 'credit'
+    is_recent = Transaction.date >= thirty_days_ago
+    is_previous = Transaction.date < thirty_days_ago
+    is_high_value = db.and_(is_recent, is_debit, Transaction.amount > 5000)
+    is_weekend = db.func.strftime('%w', Transaction.date).in_(('0', '6'))  # Sunday = 0, Saturday = 6
+    in_window = db.and_(Transaction.user_id == current_user.id, Transaction.date >= sixty_days_ago)
+    
+    # Income, expenses and large purchases for both windows in a single aggregate query
+    totals = db.session.query(
+        db.func.count(db.case((is_recent, 1))).label('recent_count'),
+        db.func.count(db.case((is_previous, 1))).label('previous_count'),
+        _conditional_sum(db.and_(is_recent, is_credit)).label('income'),
+        _conditional_sum(db.and_(is_recent, is_debit)).label('expenses'),
+        _conditional_sum(db.and_(is_previous, is_credit)).label('prev_income'),
+        _conditional_sum(db.and_(is_previous, is_debit)).label('prev_expenses'),
+        db.func.count(db.case((is_high_value, 1))).label('high_value_count'),
+        _conditional_sum(is_high_value).label('high_value_total')
+    ).filter(in_window).one()
     
     # Debug output
-    print(f"🔍 DEBUG INSIGHTS - User: {current_user.username}")
-    print(f"🔍 DEBUG INSIGHTS - Recent transactions (last 30 days): {len(recent_transactions)}")
-    
-    # Get transactions from 30-60 days ago for comparison
-    sixty_days_ago = datetime.now() - timedelta(days=60)
-    previous_transactions = Transaction.query.filter_by(user_id=current_user.id)\
-                                            .filter(Transaction.date >= sixty_days_ago)\
-                                            .filter(Transaction.date < thirty_days_ago)\
-                                            .all()
-    
-    print(f"🔍 DEBUG INSIGHTS - Previous transactions (30-60 days ago): {len(previous_transactions)}")
+    app.logger.debug("Insights - User: %s", current_user.username)
+    app.logger.debug("Insights - Recent transactions (last 30 days): %s", totals.recent_count)
+    app.logger.debug("Insights - Previous transactions (30-60 days ago): %s", totals.previous_count)
     
-    if not recent_transactions:
-        print(f"⚠️ WARNING - No transactions found for user {current_user.username}")
-        return jsonify({'insights': [{
+    if not totals.recent_count:
+        app.logger.debug("Insights - No transactions found for user %s", current_user.username)
+        return [{
             'type': 'info',
             'icon': 'fa-info-circle',
             'title': 'No Transaction Data',
             'description': 'Start syncing your transactions to receive personalized financial insights! Click the "Sync Email" button on the dashboard.',
             'impact': 'Low',
             'confidence': 100
-        }]})
+        }]
     
     # Calculate user-specific metrics
     username = current_user.username.capitalize()
     
-    # Insight 1: PERSONALIZED Weekend vs Weekday spending analysis
-    weekend_spending = sum(t.amount for t in recent_transactions 
-                          if t.date.weekday() >= 5 and t.transaction_type == 'debit')
-    weekday_spending = sum(t.amount for t in recent_transactions 
-                          if t.date.weekday() < 5 and t.transaction_type == 'debit')
+    # Per-category debit totals for both windows (plus the weekend share) in one grouped query
+    category_rows = db.session.query(
+        Transaction.category_id,
+        _conditional_sum(is_recent).label('total'),
+        db.func.count(db.case((is_recent, 1))).label('count'),
+        _conditional_sum(is_previous).label('prev_total'),
+        db.func.count(db.case((is_previous, 1))).label('prev_count'),
+        _conditional_sum(db.and_(is_recent, is_weekend)).label('weekend_total'),
+        db.func.count(db.case((db.and_(is_recent, is_weekend), 1))).label('weekend_count')
+    ).filter(in_window, is_debit, Transaction.category_id.isnot(None))\
+     .group_by(Transaction.category_id)\
+     .all()
+    
+    # Split the grouped rows into per-window dicts keyed by category id in a single pass,
+    # tracking the top categories as we go (names are resolved only for the winners)
+    category_totals, category_counts, prev_category_totals = {}, {}, {}
+    categorized_spending = 0.0
+    top_category_id, top_amount = None, 0.0
+    top_weekend_category_id, top_weekend_amount = None, 0.0
+    for row in category_rows:
+        category_id = row.category_id
+        if row.count:
+            total = float(row.total)
+            category_totals[category_id] = total
+            category_counts[category_id] = row.count
+            categorized_spending += total
+            if top_category_id is None or total > top_amount:
+                top_category_id, top_amount = category_id, total
+        if row.prev_count:
+            prev_category_totals[category_id] = float(row.prev_total)
+        if row.weekend_count:
+            weekend_total = float(row.weekend_total)
+            if top_weekend_category_id is None or weekend_total > top_weekend_amount:
+                top_weekend_category_id, top_weekend_amount = category_id, weekend_total
+    
+    # One row per active day in the last 30 days (weekend flag, debit spending, debit count),
+    # shared by the weekend analysis and the daily spike check
+    day_rows = db.session.query(
+        db.func.max(db.case((is_weekend, 1), else_=0)).label('weekend'),
+        _conditional_sum(is_debit).label('spending'),
+        db.func.count(db.case((is_debit, 1))).label('debit_count')
+    ).filter(Transaction.user_id == current_user.id, is_recent)\
+     .group_by(db.func.date(Transaction.date))\
+     .all()
     
-    # Count actual unique days
-    weekend_dates = set(t.date.date() for t in recent_transactions if t.date.weekday() >= 5)
-    weekday_dates = set(t.date.date() for t in recent_transactions if t.date.weekday() < 5)
+    day_type_spending = {True: 0.0, False: 0.0}
+    day_type_days = {True: 0, False: 0}
+    debit_day_totals = []
+    for row in day_rows:
+        weekend = bool(row.weekend)
+        spending = float(row.spending)
+        day_type_spending[weekend] += spending
+        day_type_days[weekend] += 1
+        if row.debit_count:
+            debit_day_totals.append(spending)
     
-    if len(weekend_dates) > 0 and len(weekday_dates) > 0:
-        weekend_avg = weekend_spending / len(weekend_dates)
-        weekday_avg = weekday_spending / len(weekday_dates)
+    # Insight 1: PERSONALIZED Weekend vs Weekday spending analysis
+    if day_type_days[True] and day_type_days[False]:
+        weekend_avg = day_type_spending[True] / day_type_days[True]
+        weekday_avg = day_type_spending[False] / day_type_days[False]
         
-        if weekend_avg > weekday_avg * 1.3:
+        if weekday_avg > 0 and weekend_avg > weekday_avg * 1.3:
             increase_pct = int((weekend_avg - weekday_avg) / weekday_avg * 100)
-            weekend_categories = defaultdict(float)
-            for t in recent_transactions:
-                if t.date.weekday() >= 5 and t.transaction_type == 'debit' and t.category:
-                    weekend_categories[t.category.name] += t.amount
-            
-            top_weekend_category = max(weekend_categories, key=weekend_categories.get) if weekend_categories else 'entertainment'
+            top_weekend_category = get_category_name(top_weekend_category_id) if top_weekend_category_id is not None else 'entertainment'
             
             insights.append({
                 'type': 'warning',
@@ -1409,34 +1571,18 @@ def api_analytics_insights():
             })
     
     # Insight 2: PERSONALIZED Top category with specific amounts and trends
-    category_totals = {}
-    category_counts = {}
-    for t in recent_transactions:
-        if t.transaction_type == 'debit' and t.category:
-            category_totals[t.category.name] = category_totals.get(t.category.name, 0) + t.amount
-            category_counts[t.category.name] = category_counts.get(t.category.name, 0) + 1
-    
-    print(f"🔍 DEBUG INSIGHTS - Category totals: {category_totals}")
-    print(f"🔍 DEBUG INSIGHTS - Category counts: {category_counts}")
-    
-    # Previous period categories for comparison
-    prev_category_totals = {}
-    for t in previous_transactions:
-        if t.transaction_type == 'debit' and t.category:
-            prev_category_totals[t.category.name] = prev_category_totals.get(t.category.name, 0) + t.amount
-    
-    print(f"🔍 DEBUG INSIGHTS - Previous category totals: {prev_category_totals}")
-    
-    if category_totals:
-        top_category = max(category_totals, key=category_totals.get)
-        top_amount = category_totals[top_category]
-        top_count = category_counts[top_category]
-        total_spending = sum(category_totals.values())
-        percentage = (top_amount / total_spending * 100) if total_spending > 0 else 0
+    app.logger.debug("Insights - Category totals: %s", category_totals)
+    app.logger.debug("Insights - Category counts: %s", category_counts)
+    app.logger.debug("Insights - Previous category totals: %s", prev_category_totals)
+    
+    if top_category_id is not None:
+        top_category = get_category_name(top_category_id)
+        top_count = category_counts[top_category_id]
+        percentage = (top_amount / categorized_spending * 100) if categorized_spending > 0 else 0
         avg_per_transaction = top_amount / top_count if top_count > 0 else 0
         
         # Check if spending increased
-        prev_amount = prev_category_totals.get(top_category, 0)
+        prev_amount = prev_category_totals.get(top_category_id, 0)
         trend = ""
         if prev_amount > 0:
             change_pct = ((top_amount - prev_amount) / prev_amount * 100)
@@ -1456,14 +1602,14 @@ def api_analytics_insights():
             })
     
     # Insight 3: PERSONALIZED Savings with specific goals
-    total_income = sum(t.amount for t in recent_transactions if t.transaction_type == 'credit')
-    total_expenses = sum(t.amount for t in recent_transactions if t.transaction_type == 'debit')
+    total_income = float(totals.income)
+    total_expenses = float(totals.expenses)
     savings = total_income - total_expenses
     savings_rate = (savings / total_income * 100) if total_income > 0 else 0
     
     # Previous period comparison
-    prev_income = sum(t.amount for t in previous_transactions if t.transaction_type == 'credit')
-    prev_expenses = sum(t.amount for t in previous_transactions if t.transaction_type == 'debit')
+    prev_income = float(totals.prev_income)
+    prev_expenses = float(totals.prev_expenses)
     prev_savings = prev_income - prev_expenses
     prev_savings_rate = (prev_savings / prev_income * 100) if prev_income > 0 else 0
     
@@ -1512,18 +1658,22 @@ def api_analytics_insights():
                 })
     
     # Insight 4: PERSONALIZED Recurring merchant with specific savings potential
-    merchant_data = defaultdict(lambda: {'count': 0, 'total': 0, 'dates': []})
-    for t in recent_transactions:
-        if t.merchant and t.transaction_type == 'debit':
-            merchant_data[t.merchant]['count'] += 1
-            merchant_data[t.merchant]['total'] += t.amount
-            merchant_data[t.merchant]['dates'].append(t.date)
-    
-    frequent_merchants = {m: d for m, d in merchant_data.items() if d['count'] >= 4}
-    if frequent_merchants:
-        top_merchant = max(frequent_merchants, key=lambda m: frequent_merchants[m]['total'])
-        visit_count = frequent_merchants[top_merchant]['count']
-        total_spent = frequent_merchants[top_merchant]['total']
+    # Highest-spend merchant among those visited at least 4 times
+    frequent_merchant = db.session.query(
+        Transaction.merchant,
+        db.func.count(Transaction.id).label('count'),
+        db.func.sum(Transaction.amount).label('total')
+    ).filter(Transaction.user_id == current_user.id, is_recent, is_debit)\
+     .filter(Transaction.merchant != None, Transaction.merchant != '')\
+     .group_by(Transaction.merchant)\
+     .having(db.func.count(Transaction.id) >= 4)\
+     .order_by(db.func.sum(Transaction.amount).desc())\
+     .first()
+    
+    if frequent_merchant:
+        top_merchant = frequent_merchant.merchant
+        visit_count = frequent_merchant.count
+        total_spent = float(frequent_merchant.total)
         avg_spend = total_spent / visit_count
         
         # Calculate potential savings
@@ -1539,10 +1689,9 @@ def api_analytics_insights():
         })
     
     # Insight 5: PERSONALIZED High-value transaction detection
-    high_value_transactions = [t for t in recent_transactions 
-                               if t.transaction_type == 'debit' and t.amount > 5000]
-    if high_value_transactions:
-        total_high_value = sum(t.amount for t in high_value_transactions)
+    high_value_count = totals.high_value_count
+    if high_value_count:
+        total_high_value = float(totals.high_value_total)
         percentage_of_spending = (total_high_value / total_expenses * 100) if total_expenses > 0 else 0
         
         if percentage_of_spending > 40:
@@ -1550,34 +1699,32 @@ def api_analytics_insights():
                 'type': 'warning',
                 'icon': 'fa-money-bill-wave',
                 'title': f'{username}, Large Purchases Detected',
-                'description': f'You made {len(high_value_transactions)} large transactions (₹5000+) totaling ₹{total_high_value:,.0f} ({percentage_of_spending:.0f}% of expenses). Review these carefully to ensure they\'re necessary!',
+                'description': f'You made {high_value_count} large transactions (₹5000+) totaling ₹{total_high_value:,.0f} ({percentage_of_spending:.0f}% of expenses). Review these carefully to ensure they\'re necessary!',
                 'impact': 'High',
                 'confidence': 91
             })
     
     # Insight 6: PERSONALIZED Daily spending pattern
-    daily_spending = defaultdict(float)
-    for t in recent_transactions:
-        if t.transaction_type == 'debit':
-            daily_spending[t.date.date()] += t.amount
+    daily_spending = np.array(debit_day_totals, dtype=np.float64)
     
-    if daily_spending:
-        avg_daily = sum(daily_spending.values()) / len(daily_spending)
-        high_spend_days = [day for day, amount in daily_spending.items() if amount > avg_daily * 2]
+    if daily_spending.size:
+        avg_daily = float(daily_spending.mean())
+        high_spend_days = int(np.count_nonzero(daily_spending > avg_daily * 2))
         
-        if len(high_spend_days) >= 3:
+        if high_spend_days >= 3:
             insights.append({
                 'type': 'warning',
                 'icon': 'fa-calendar-day',
                 'title': f'{username}, Spending Spike Days',
-                'description': f'You had {len(high_spend_days)} days with unusually high spending (2x your daily average of ₹{avg_daily:.0f}). Try to spread out large purchases to avoid budget shocks!',
+                'description': f'You had {high_spend_days} days with unusually high spending (2x your daily average of ₹{avg_daily:.0f}). Try to spread out large purchases to avoid budget shocks!',
                 'impact': 'Medium',
                 'confidence': 86
             })
     
         # Insight 7: PERSONALIZED Category comparison with benchmarks
-        if 'dining' in category_totals or 'entertainment' in category_totals:
-            discretionary_total = category_totals.get('dining', 0) + category_totals.get('entertainment', 0)
+        discretionary_total = sum(total for category_id, total in category_totals.items()
+                                  if get_category_name(category_id).lower() in ('dining', 'entertainment'))
+        if discretionary_total > 0:
             discretionary_pct = (discretionary_total / total_expenses * 100) if total_expenses > 0 else 0
             
             if discretionary_pct > 25:
@@ -1590,32 +1737,36 @@ def api_analytics_insights():
                     'confidence': 89
                 })
         
-    print(f"✅ DEBUG INSIGHTS - Generated {len(insights)} insights for {username}")
-    print(f"📊 DEBUG INSIGHTS - Insight types: {[i['type'] for i in insights]}")
+    if app.debug:
+        app.logger.debug("Insights - Generated %d insights for %s", len(insights), username)
+        app.logger.debug("Insights - Insight types: %s", [i['type'] for i in insights])
     
-    return jsonify({'insights': insights})
+    return insights
 
 @app.route('/api/analytics/top-merchants')
 @login_required
 def api_top_merchants():
     """Get top merchants by spending - FIXED with better filtering"""
-    from datetime import datetime, timedelta
     
     months = request.args.get('months', 1, type=int)
     start_date = datetime.now() - timedelta(days=months*30)
     
     # Debug: Check total transactions
-    total_trans = Transaction.query.filter_by(user_id=current_user.id).count()
-    print(f"🔍 DEBUG - Total transactions for user: {total_trans}")
+    total_trans = db.session.query(db.func.count(Transaction.id))\
+     .filter(Transaction.user_id == current_user.id).scalar()
     
-    # Get all debit transactions with merchants
-    all_debits = Transaction.query.filter_by(
-        user_id=current_user.id,
-        transaction_type='debit'
-    ).filter(Transaction.date >= start_date).all()
+    # Count debit transactions in range without loading them
+    debits_in_range = db.session.query(Transaction.id)\
+     .filter(Transaction.user_id == current_user.id)\
+     .filter(Transaction.transaction_type == 'debit')\
+     .filter(Transaction.date >= start_date)
+    debit_count = debits_in_range.count()
     
-    print(f"🔍 DEBUG - Debit transactions in date range: {len(all_debits)}")
-    print(f"🔍 DEBUG - Sample merchants: {[t.merchant for t in all_debits[:5]]}")
+    if app.debug:
+        sample_merchants = [merchant for (merchant,) in debits_in_range.with_entities(Transaction.merchant).limit(5)]
+        app.logger.debug("Top merchants - Total transactions for user: %s", total_trans)
+        app.logger.debug("Top merchants - Debit transactions in date range: %s", debit_count)
+        app.logger.debug("Top merchants - Sample merchants: %s", sample_merchants)
     
     # Query with better filtering (check for None and empty string)
     merchants = db.session.query(
@@ -1632,7 +1783,7 @@ def api_top_merchants():
      .limit(10)\
      .all()
     
-    print(f"🔍 DEBUG - Merchants found: {len(merchants)}")
+    app.logger.debug("Top merchants - Merchants found: %d", len(merchants))
     
     total_spending = sum(m.total for m in merchants) if merchants else 0
     
@@ -1642,7 +1793,7 @@ def api_top_merchants():
             'merchants': [],
             'debug': {
                 'total_transactions': total_trans,
-                'debit_transactions': len(all_debits),
+                'debit_transactions': debit_count,
                 'message': 'No merchants found. Check if transactions have merchant field populated.'
             }
         })
@@ -1656,6 +1807,60 @@ def api_top_merchants():
         } for m in merchants]
     })
 
+# Dash aggregates are global (not per user), so every polling browser shares one cached copy per interval
+_DASH_CACHE = TTLCache(maxsize=4, ttl=30)
+_DASH_CACHE_LOCK = threading.Lock()
+
+def _dash_cached(name, compute):
+    """Return a cached Dash aggregate, computing it at most once per TTL window"""
+    with _DASH_CACHE_LOCK:
+        value = _DASH_CACHE.get(name)
+        if value is None:
+            value = compute()
+            _DASH_CACHE[name] = value
+        return value
+
+def _get_monthly_data():
+    """(month label, total) pairs across all transactions"""
+    def compute():
+        # Bucket on the stored integer year_month (YYYYMM) instead of running strftime per row
+        rows = db.session.query(
+            Transaction.year_month,
+            db.func.sum(Transaction.amount).label('total')
+        ).group_by(Transaction.year_month)\
+         .order_by(Transaction.year_month).all()
+        return [(f"{row.year_month // 100:04d}-{row.year_month % 100:02d}", float(row.total)) for row in rows]
+    return _dash_cached('monthly', compute)
+
+def _get_category_data():
+    """(category name, total) pairs across all transactions"""
+    def compute():
+        rows = db.session.query(
+            Category.name,
+            db.func.sum(Transaction.amount).label('total')
+        ).join(Transaction)\
+         .group_by(Category.name).all()
+        return [(row.name, float(row.total)) for row in rows]
+    return _dash_cached('category', compute)
+
+def _get_source_breakdown():
+    """Counts and totals of Gmail-synced vs manual transactions in one scan"""
+    def compute():
+        is_gmail = Transaction.gmail_message_id.isnot(None)
+        row = db.session.query(
+            db.func.count(db.case((is_gmail, 1))).label('gmail_count'),
+            _conditional_sum(is_gmail).label('gmail_amount'),
+            db.func.count(db.case((db.not_(is_gmail), 1))).label('manual_count'),
+            _conditional_sum(db.not_(is_gmail)).label('manual_amount')
+        ).one()
+        return {
+            'gmail_count': row.gmail_count,
+            'gmail_amount': float(row.gmail_amount),
+            'manual_count': row.manual_count,
+            'manual_amount': float(row.manual_amount)
+        }
+    return _dash_cached('sources', compute)
+
 # Initialize Dash app for advanced analytics
 def create_dash_app(flask_app):
     dash_app = dash.Dash(__name__, server=flask_app, url_base_pathname='/dash/')
@@ -1694,15 +1899,11 @@ def create_dash_app(flask_app):
             try:
                 # Get all users' transactions (since Dash doesn't have access to current_user)
                 # In production, you'd want to add proper user authentication for Dash
-                monthly_data = db.session.query(
-                    db.func.strftime('%Y-%m', Transaction.date).label('month'),
-                    db.func.sum(Transaction.amount).label('total')
-                ).group_by(db.func.strftime('%Y-%m', Transaction.date))\
-                 .order_by('month').all()
+                monthly_data = _get_monthly_data()
                 
                 if monthly_data:
-                    months = [item.month for item in monthly_data]
-                    amounts = [float(item.total) for item in monthly_data]
+                    months = [month for month, _ in monthly_data]
+                    amounts = [total for _, total in monthly_data]
                     
                     fig = go.Figure()
                     fig.add_trace(go.Scatter(
@@ -1751,15 +1952,11 @@ def create_dash_app(flask_app):
         with flask_app.app_context():
             try:
                 # Get category breakdown for all users' transactions
-                category_data = db.session.query(
-                    Category.name,
-                    db.func.sum(Transaction.amount).label('total')
-                ).join(Transaction)\
-                 .group_by(Category.name).all()
+                category_data = _get_category_data()
                 
                 if category_data:
-                    categories = [item.name for item in category_data]
-                    amounts = [float(item.total) for item in category_data]
+                    categories = [name for name, _ in category_data]
+                    amounts = [total for _, total in category_data]
                     
                     # Create pie chart with custom colors
                     colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8', 
@@ -1816,10 +2013,11 @@ def create_dash_app(flask_app):
         with flask_app.app_context():
             try:
                 # Get transaction statistics
-                total_transactions = Transaction.query.count()
-                gmail_transactions = Transaction.query.filter(Transaction.gmail_message_id.isnot(None)).count()
-                manual_transactions = total_transactions - gmail_transactions
-                total_amount = db.session.query(db.func.sum(Transaction.amount)).scalar() or 0
+                sources = _get_source_breakdown()
+                gmail_transactions = sources['gmail_count']
+                manual_transactions = sources['manual_count']
+                total_transactions = gmail_transactions + manual_transactions
+                total_amount = sources['gmail_amount'] + sources['manual_amount']
                 
                 return html.Div([
                     html.Div([
@@ -1858,13 +2056,11 @@ def create_dash_app(flask_app):
         with flask_app.app_context():
             try:
                 # Get breakdown by data source
-                gmail_count = Transaction.query.filter(Transaction.gmail_message_id.isnot(None)).count()
-                gmail_amount = db.session.query(db.func.sum(Transaction.amount))\
-                    .filter(Transaction.gmail_message_id.isnot(None)).scalar() or 0
-                
-                manual_count = Transaction.query.filter(Transaction.gmail_message_id.is_(None)).count()
-                manual_amount = db.session.query(db.func.sum(Transaction.amount))\
-                    .filter(Transaction.gmail_message_id.is_(None)).scalar() or 0
+                sources = _get_source_breakdown()
+                gmail_count = sources['gmail_count']
+                gmail_amount = sources['gmail_amount']
+                manual_count = sources['manual_count']
+                manual_amount = sources['manual_amount']
                 
                 if gmail_count > 0 or manual_count > 0:
                     fig = go.Figure(data=[
@@ -1917,6 +2113,7 @@ if __name__ == '__main__':
     
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         
         # Create default categories
         default_categories = [
@@ -1924,13 +2121,18 @@ if __name__ == '__main__':
             'Healthcare', 'Shopping', 'Dining', 'Bills', 'Other'
         ]
         
-        for cat_name in default_categories:
-            if not Category.query.filter_by(name=cat_name).first():
-                category = Category(name=cat_name, description=f"Default {cat_name} category")
-                db.session.add(category)
+        # Insert only the missing categories, in one statement
+        existing_names = set(db.session.execute(db.select(Category.name)).scalars())
+        missing_categories = [{'name': cat_name, 'description': f"Default {cat_name} category"}
+                              for cat_name in default_categories if cat_name not in existing_names]
+        if missing_categories:
+            db.session.execute(db.insert(Category), missing_categories)
         
         db.session.commit()
         
+        # Warm the category lookup cache now that default categories exist
+        _refresh_category_cache()
+        
         print("🏦 Smart Personal Finance Automator")
         print("=" * 50)
         print("✅ Database initialized successfully!")
@@ -1,22 +1,43 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from datetime import datetime
+from sqlalchemy import inspect, lambda_stmt
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred
+from sqlalchemy.schema import CreateIndex
+from datetime import datetime, time, timedelta
+import hashlib
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+# Number of leading description characters compared when detecting duplicate transactions
+DESCRIPTION_PREFIX_LENGTH = 100
+
+def description_prefix_hash(description):
+    """Signed 64-bit blake2b hash of a description's duplicate-detection prefix"""
+    prefix = (description or '')[:DESCRIPTION_PREFIX_LENGTH]
+    return int.from_bytes(hashlib.blake2b(prefix.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+def _as_datetime(value):
+    """Promote a date to midnight so DateTime column comparisons stay plain range predicates"""
+    return value if isinstance(value, datetime) else datetime.combine(value, time.min)
+
+def _default_description_prefix_hash(context):
+    """Column default computing the prefix hash from the inserted description"""
+    return description_prefix_hash(context.get_current_parameters().get('description'))
+
 class User(UserMixin, db.Model):
     """User model for authentication and user management"""
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
     is_active = db.Column(db.Boolean, default=True)
     
-    # Relationships
-    transactions = db.relationship('Transaction', backref='user', lazy=True, cascade='all, delete-orphan')
-    savings_goals = db.relationship('SavingsGoal', backref='user', lazy=True, cascade='all, delete-orphan')
+    # Relationships (lazy per-object loads; use selectinload at call sites that iterate many users)
+    transactions = db.relationship('Transaction', backref='user', lazy='select', cascade='all, delete-orphan')
+    savings_goals = db.relationship('SavingsGoal', backref='user', lazy='select', cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password"""
@@ -28,14 +49,17 @@ class User(UserMixin, db.Model):
     
     def get_total_spending(self, start_date=None, end_date=None):
         """Get total spending for user in a date range"""
-        query = Transaction.query.filter_by(user_id=self.id, transaction_type='debit')
+        # lambda_stmt caches the compiled SQL per branch shape; only the bound values change between calls
+        user_id = self.id
+        stmt = lambda_stmt(lambda: db.select(db.func.sum(Transaction.amount))
+                           .where(Transaction.user_id == user_id, Transaction.transaction_type == 'debit'))
         
         if start_date:
-            query = query.filter(Transaction.date >= start_date)
+            stmt += lambda s: s.where(Transaction.date >= start_date)
         if end_date:
-            query = query.filter(Transaction.date <= end_date)
+            stmt += lambda s: s.where(Transaction.date <= end_date)
             
-        return query.with_entities(db.func.sum(Transaction.amount)).scalar() or 0
+        return db.session.execute(stmt).scalar() or 0
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -47,13 +71,13 @@ class Category(db.Model):
     description = db.Column(db.Text)
     color = db.Column(db.String(7), default='#007bff')  # Hex color code
     icon = db.Column(db.String(50), default='fas fa-shopping-cart')  # FontAwesome icon class
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
     
-    # Relationships
-    transactions = db.relationship('Transaction', backref='category', lazy=True)
+    # Relationships (lazy per-object loads; use selectinload at call sites that iterate many categories)
+    transactions = db.relationship('Transaction', back_populates='category', lazy='select')
     
     # Keywords for automatic categorization
-    keywords = db.relationship('CategoryKeyword', backref='category', lazy=True, cascade='all, delete-orphan')
+    keywords = db.relationship('CategoryKeyword', backref='category', lazy='select', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Category {self.name}>'
@@ -74,31 +98,67 @@ class Transaction(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=True)
     
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    # Money columns keep NUMERIC(p, 2) storage but load as float (asdecimal=False), like every consumer uses them
+    amount = db.Column(db.Numeric(10, 2, asdecimal=False), nullable=False)
     description = db.Column(db.Text, nullable=False)
     merchant = db.Column(db.String(200))
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     transaction_type = db.Column(db.String(20), nullable=False, default='debit')  # debit, credit
     
+    # Hash of the description prefix, filled in on insert for cheap duplicate lookups
+    description_prefix_hash = db.Column(db.BigInteger, default=_default_description_prefix_hash)
+    
+    # Integer YYYYMM month bucket maintained by the database for indexed monthly grouping
+    # (extract() compiles to strftime on SQLite and EXTRACT on PostgreSQL)
+    year_month = db.Column(db.Integer, db.Computed(
+        db.cast(db.extract('year', date) * 100 + db.extract('month', date), db.Integer), persisted=True
+    ))
+    
     # Source information
     source = db.Column(db.String(50), default='manual')  # manual, sms, email, api
-    raw_text = db.Column(db.Text)  # Original SMS/email text
+    raw_text = deferred(db.Column(db.Text))  # Original SMS/email text, loaded only on access
     confidence_score = db.Column(db.Float, default=1.0)  # NLP extraction confidence
-    gmail_message_id = db.Column(db.String(100))  # Gmail message ID for duplicate prevention
-    
-    # Additional metadata
-    account_last_four = db.Column(db.String(4))  # Last 4 digits of account
-    reference_number = db.Column(db.String(100))
-    balance_after = db.Column(db.Numeric(10, 2))
-    
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Gmail message ID for duplicate prevention (queried by column, rarely read from objects)
+    gmail_message_id = deferred(db.Column(db.String(100)), group='metadata')
+    
+    # Additional metadata, deferred as one group: load with undefer_group('metadata') when needed
+    account_last_four = deferred(db.Column(db.String(4)), group='metadata')  # Last 4 digits of account
+    reference_number = deferred(db.Column(db.String(100)), group='metadata')
+    balance_after = deferred(db.Column(db.Numeric(10, 2, asdecimal=False)), group='metadata')
+    
+    # Timestamps are filled in by the database (UTC), so bulk inserts carry no per-row Python defaults
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+    
+    # Never lazy-load the category per row: callers must eager-load it with
+    # selectinload(Transaction.category), otherwise access raises instead of issuing N+1 SELECTs
+    category = db.relationship('Category', back_populates='transactions', lazy='raise_on_sql')
+    
+    # Composite indexes for per-user date range, type, source, category budget and merchant queries,
+    # lookups used for duplicate checks (Gmail message ID, description prefix hash),
+    # and a covering (year_month, amount) index for the global Dash monthly trend
+    __table_args__ = (
+        db.Index('ix_txn_user_date', 'user_id', 'date'),
+        db.Index('ix_txn_user_type_date', 'user_id', 'transaction_type', 'date'),
+        db.Index('ix_txn_user_category_type_date', 'user_id', 'category_id', 'transaction_type', 'date'),
+        db.Index('ix_txn_user_source_date', 'user_id', 'source', 'date'),
+        # Partial: manual rows (NULL message id) stay out of the index. Not unique, because one
+        # email can yield several transactions that share its message id
+        db.Index('ix_txn_user_gmail_message_id', 'user_id', 'gmail_message_id',
+                 sqlite_where=db.text('gmail_message_id IS NOT NULL'),
+                 postgresql_where=db.text('gmail_message_id IS NOT NULL')),
+        db.Index('ix_txn_user_merchant', 'user_id', 'merchant'),
+        db.Index('ix_txn_user_year_month', 'user_id', 'year_month'),
+        db.Index('ix_txn_user_day', 'user_id', db.func.date(date)),
+        db.Index('ix_txn_user_desc_prefix_hash', 'user_id', 'description_prefix_hash'),
+        db.Index('ix_txn_year_month_amount', 'year_month', 'amount'),
+    )
     
     def __repr__(self):
         return f'<Transaction {self.amount} - {self.description[:30]}...>'
     
     def to_dict(self):
-        """Convert transaction to dictionary for JSON serialization"""
+        """Convert transaction to dictionary for JSON serialization (load with selectinload(Transaction.category))"""
         return {
             'id': self.id,
             'amount': float(self.amount),
@@ -119,27 +179,38 @@ class SavingsGoal(db.Model):
     
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    target_amount = db.Column(db.Numeric(10, 2), nullable=False)
-    current_amount = db.Column(db.Numeric(10, 2), default=0.00)
+    target_amount = db.Column(db.Numeric(10, 2, asdecimal=False), nullable=False)
+    current_amount = db.Column(db.Numeric(10, 2, asdecimal=False), default=0.00)
     target_date = db.Column(db.DateTime)
     
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))  # Category to save on
     is_active = db.Column(db.Boolean, default=True)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
     
-    @property
+    @hybrid_property
     def progress_percentage(self):
         """Calculate completion percentage"""
-        if self.target_amount == 0:
+        target = float(self.target_amount)
+        if target == 0:
             return 0
-        return min((float(self.current_amount) / float(self.target_amount)) * 100, 100)
+        return min(float(self.current_amount or 0) * 100 / target, 100)
+    
+    @progress_percentage.expression
+    def progress_percentage(cls):
+        """SQL form, so goal listings can compute progress in the query"""
+        current = db.func.coalesce(cls.current_amount, 0)
+        return db.case(
+            (cls.target_amount == 0, 0),
+            (current >= cls.target_amount, 100),
+            else_=db.cast(current, db.Float) * 100 / cls.target_amount
+        )
     
     @property
     def remaining_amount(self):
         """Calculate remaining amount to reach goal"""
-        return max(float(self.target_amount) - float(self.current_amount), 0)
+        return max(float(self.target_amount - (self.current_amount or 0)), 0)
     
     def __repr__(self):
         return f'<SavingsGoal {self.title}>'
@@ -151,43 +222,61 @@ class Budget(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=True)
     
     name = db.Column(db.String(200), nullable=False)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount = db.Column(db.Numeric(10, 2, asdecimal=False), nullable=False)
     period = db.Column(db.String(20), default='monthly')  # monthly, weekly, yearly
     
     start_date = db.Column(db.DateTime, nullable=False)
     end_date = db.Column(db.DateTime)
     is_active = db.Column(db.Boolean, default=True)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
     
-    def get_spent_amount(self):
-        """Get amount spent against this budget"""
-        query = Transaction.query.filter(
-            Transaction.user_id == self.user_id,
-            Transaction.date >= self.start_date,
-            Transaction.transaction_type == 'debit'
-        )
+    # Spent amount memoized per instance (instances live for one request/session)
+    _spent = None
+    
+    def _period_bounds(self):
+        """Half-open [start, end) datetime range of this budget; end is None when open-ended"""
+        start = _as_datetime(self.start_date)
         
+        # end_date is an inclusive calendar day, so the range runs up to the following midnight
+        end_exclusive = None
         if self.end_date:
-            query = query.filter(Transaction.date <= self.end_date)
+            end_exclusive = datetime.combine(_as_datetime(self.end_date).date() + timedelta(days=1), time.min)
         
-        if self.category_id:
-            query = query.filter(Transaction.category_id == self.category_id)
-        
-        return query.with_entities(db.func.sum(Transaction.amount)).scalar() or 0
+        return start, end_exclusive
+    
+    def get_spent_amount(self):
+        """Get amount spent against this budget"""
+        if self._spent is None:
+            user_id, category_id = self.user_id, self.category_id
+            start, end_exclusive = self._period_bounds()
+            stmt = lambda_stmt(lambda: db.select(db.func.sum(Transaction.amount))
+                               .where(Transaction.user_id == user_id,
+                                      Transaction.date >= start,
+                                      Transaction.transaction_type == 'debit'))
+            
+            if end_exclusive:
+                stmt += lambda s: s.where(Transaction.date < end_exclusive)
+            
+            if category_id:
+                stmt += lambda s: s.where(Transaction.category_id == category_id)
+            
+            self._spent = db.session.execute(stmt).scalar() or 0
+        return self._spent
     
     @property
     def remaining_amount(self):
         """Calculate remaining budget amount"""
-        return max(float(self.amount) - float(self.get_spent_amount()), 0)
+        return max(float(self.amount - self.get_spent_amount()), 0)
     
     @property
     def usage_percentage(self):
         """Calculate budget usage percentage"""
-        if self.amount == 0:
+        amount = float(self.amount)
+        if amount == 0:
             return 0
-        return min((float(self.get_spent_amount()) / float(self.amount)) * 100, 100)
+        return min(float(self.get_spent_amount()) * 100 / amount, 100)
     
     def __repr__(self):
         return f'<Budget {self.name}>'
@@ -202,7 +291,7 @@ class Notification(db.Model):
     notification_type = db.Column(db.String(50), default='info')  # info, warning, success, error
     
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
     
     # Optional: Link to related objects
     related_transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id'))
@@ -212,11 +301,80 @@ class Notification(db.Model):
     def __repr__(self):
         return f'<Notification {self.title}>'
 
+# Rows per batch when backfilling description_prefix_hash on upgraded databases
+PREFIX_HASH_BACKFILL_BATCH_SIZE = 1000
+
+def _backfill_description_prefix_hash():
+    """Fill description_prefix_hash for rows written before the column existed, one batch per transaction"""
+    table = Transaction.__table__
+    update = table.update()\
+        .where(table.c.id == db.bindparam('row_id'))\
+        .values(description_prefix_hash=db.bindparam('prefix_hash'))
+    
+    last_id = 0
+    filled = 0
+    while True:
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                db.select(table.c.id, table.c.description)
+                .where(table.c.description_prefix_hash.is_(None), table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(PREFIX_HASH_BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            connection.execute(update, [
+                {'row_id': row_id, 'prefix_hash': description_prefix_hash(description)}
+                for row_id, description in rows
+            ])
+        last_id = rows[-1].id
+        filled += len(rows)
+    
+    if filled:
+        print(f"Backfilled description_prefix_hash for {filled} transactions")
+
+def upgrade_schema():
+    """Add transaction columns and indexes missing from databases created by older versions"""
+    # create_all only creates missing tables; it never alters an existing one
+    table = Transaction.__table__
+    inspector = inspect(db.engine)
+    if not inspector.has_table(table.name):
+        return
+    
+    existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+    if 'description_prefix_hash' not in existing_columns:
+        with db.engine.begin() as connection:
+            connection.execute(db.text(f'ALTER TABLE "{table.name}" ADD COLUMN description_prefix_hash BIGINT'))
+        print("Added transaction.description_prefix_hash column")
+    
+    # Old rows need their hash before duplicate detection can match them (also resumes an interrupted backfill)
+    _backfill_description_prefix_hash()
+    
+    if 'year_month' not in existing_columns:
+        expression = table.c.year_month.computed.sqltext.compile(
+            dialect=db.engine.dialect, compile_kwargs={'literal_binds': True, 'include_table': False}
+        )
+        # SQLite can only add VIRTUAL generated columns to an existing table (still indexable)
+        storage = 'VIRTUAL' if db.engine.dialect.name == 'sqlite' else 'STORED'
+        with db.engine.begin() as connection:
+            connection.execute(db.text(
+                f'ALTER TABLE "{table.name}" ADD COLUMN year_month INTEGER '
+                f'GENERATED ALWAYS AS ({expression}) {storage}'
+            ))
+        print("Added transaction.year_month column")
+    
+    # Indexes last, once every column they cover exists and is filled. IF NOT EXISTS instead of
+    # checkfirst, because SQLite reflection skips expression indexes such as ix_txn_user_day
+    with db.engine.begin() as connection:
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
 # Database initialization function
 def init_database():
     """Initialize database with default data"""
-    # Create all tables
+    # Create all tables, then upgrade tables created by older versions
     db.create_all()
+    upgrade_schema()
     
     # Create default categories
     default_categories = [
@@ -232,10 +390,11 @@ def init_database():
         {'name': 'Other', 'description': 'Miscellaneous expenses', 'color': '#6c757d', 'icon': 'fas fa-ellipsis-h'}
     ]
     
-    for cat_data in default_categories:
-        if not Category.query.filter_by(name=cat_data['name']).first():
-            category = Category(**cat_data)
-            db.session.add(category)
+    # Insert only the missing categories, in one statement
+    existing_names = set(db.session.execute(db.select(Category.name)).scalars())
+    missing_categories = [cat_data for cat_data in default_categories if cat_data['name'] not in existing_names]
+    if missing_categories:
+        db.session.execute(db.insert(Category), missing_categories)
     
     # Add default keywords for categories
     category_keywords = {
@@ -249,16 +408,23 @@ def init_database():
         'Bills': ['credit card', 'loan', 'mortgage', 'insurance', 'payment', 'bill']
     }
     
-    db.session.commit()
-    
-    # Add keywords to categories
-    for cat_name, keywords in category_keywords.items():
-        category = Category.query.filter_by(name=cat_name).first()
-        if category:
-            for keyword in keywords:
-                if not CategoryKeyword.query.filter_by(category_id=category.id, keyword=keyword).first():
-                    cat_keyword = CategoryKeyword(category_id=category.id, keyword=keyword)
-                    db.session.add(cat_keyword)
+    # Add keywords to categories: diff against existing (category_id, keyword) pairs, then bulk insert
+    category_ids = dict(db.session.execute(
+        db.select(Category.name, Category.id).where(Category.name.in_(list(category_keywords)))
+    ).all())
+    existing_keywords = set(db.session.execute(
+        db.select(CategoryKeyword.category_id, CategoryKeyword.keyword)
+    ).all())
+    
+    keyword_rows = [
+        {'category_id': category_ids[cat_name], 'keyword': keyword}
+        for cat_name, keywords in category_keywords.items() if cat_name in category_ids
+        for keyword in keywords
+        if (category_ids[cat_name], keyword) not in existing_keywords
+    ]
+    if keyword_rows:
+        db.session.execute(db.insert(CategoryKeyword), keyword_rows)
     
+    # Single commit for categories and keywords
     db.session.commit()
     print("Database initialized with default categories and keywords!")
@@ -6,10 +6,13 @@ Automatically fetches and processes bank notification emails
 import os
 import base64
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Iterator
 from email.mime.text import MIMEText
 import pickle
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Gmail API imports (to be installed)
 try:
@@ -17,11 +20,25 @@ try:
     from google_auth_oauthlib.flow import InstalledAppFlow
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
+    from google_auth_httplib2 import AuthorizedHttp
+    import httplib2
     GMAIL_AVAILABLE = True
 except ImportError:
     GMAIL_AVAILABLE = False
     print("Gmail API not available. Install with: pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib")
 
+# OAuth credentials shared by every GmailService built from the same credential/token files,
+# so new instances skip the token unpickle and only refresh once the access token has expired.
+# The API client itself is still built per instance because its HTTP transport is not thread-safe.
+_CREDENTIALS_CACHE = {}
+_CREDENTIALS_CACHE_LOCK = threading.Lock()
+
+
+def _compile_keywords(keywords: List[str], flags: int = 0):
+    """Compile a keyword list into one alternation regex so a text is scanned once"""
+    return re.compile('|'.join(map(re.escape, keywords)), flags)
+
+
 class GmailService:
     """
     Service class for integrating Gmail API with transaction processing
@@ -30,6 +47,69 @@ class GmailService:
     # Gmail API scope for reading emails
     SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
     
+    # Message fetches sent per batch HTTP request (Gmail recommends at most 50)
+    BATCH_SIZE = 50
+    
+    # Subject terms that flag a possible transaction email from any sender
+    SUBJECT_SEARCH_TERMS = [
+        'account', 'bank', 'payment', 'transaction', 'amount', 'balance',
+        'debited', 'credited', 'upi', 'rs', 'rupee', '₹'
+    ]
+    
+    # Base64 characters of the text/plain part decoded per email (~12 KB of text; multiple of 4)
+    MAX_BODY_BASE64_CHARS = 16384
+    
+    # Worker threads for per-message fetches when a batch request fails
+    FALLBACK_WORKERS = 16
+    
+    # Largest page messages.list() will return
+    LIST_PAGE_SIZE = 500
+    
+    # Headers requested for the metadata-only first pass
+    METADATA_HEADERS = ['Subject', 'From', 'Date']
+    
+    # STRONG transaction indicators - if ANY of these are present, it's likely transactional
+    STRONG_INDICATORS = [
+        # Transaction keywords
+        'debited', 'credited', 'withdrawn', 'deposited', 'paid', 'received',
+        'transaction', 'payment', 'purchase', 'spent',
+        
+        # Amount patterns (INR)
+        'rs.', 'rs ', 'inr', '₹', 'rupees',
+        
+        # Account activity
+        'account', 'a/c', 'acc no', 'balance',
+        
+        # Payment methods
+        'upi', 'neft', 'imps', 'rtgs', 'card', 'atm', 'pos',
+        
+        # Transaction details
+        'ref no', 'reference number', 'txn', 'merchant', 'available balance',
+        
+        # Banking context
+        'bank alert', 'bank notification', 'transaction alert'
+    ]
+    
+    # Trusted bank domains - emails from these are likely transactional
+    TRUSTED_BANKS = [
+        'hdfcbank', 'sbi.co.in', 'icicibank', 'axisbank', 'kotak', 
+        'indusind', 'yesbank', 'pnb', 'bankofbaroda', 'canarabank',
+        'unionbank', 'idbi', 'idfc', 'rbl', 'paytm', 'phonepe', 'googlepay',
+        'amazon.in', 'flipkart', 'myntra', 'swiggy', 'zomato', 'uber', 'ola'
+    ]
+    
+    # EXCLUDE promotional/marketing emails
+    EXCLUDE_PATTERNS = [
+        'unsubscribe', 'newsletter', 'offer', 'discount', 'sale',
+        'limited time', 'hurry', 'shop now', 'buy now', 'free delivery',
+        'advertisement', 'promotional', 'marketing'
+    ]
+    
+    # Keyword lists compiled once, instead of one substring scan per keyword
+    _STRONG_INDICATORS_RE = _compile_keywords(STRONG_INDICATORS)
+    _TRUSTED_BANKS_RE = _compile_keywords(TRUSTED_BANKS)
+    _EXCLUDE_PATTERNS_RE = _compile_keywords(EXCLUDE_PATTERNS)
+    
     def __init__(self, credentials_file='credentials.json', token_file='gmail_token.pickle'):
         """
         Initialize Gmail service with OAuth2 authentication
@@ -41,6 +121,7 @@ class GmailService:
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.service = None
+        self.credentials = None
         self.authenticated = False
         
         # Bank email patterns for filtering - Enhanced for better detection
@@ -82,6 +163,7 @@ class GmailService:
             # Card terms
             'debit card', 'credit card', 'atm', 'pos', 'online transaction'
         ]
+        self._transaction_keywords_re = _compile_keywords(self.transaction_keywords, re.IGNORECASE)
         
         if GMAIL_AVAILABLE:
             self._authenticate()
@@ -90,10 +172,42 @@ class GmailService:
         """
         Authenticate with Gmail API using OAuth2
         """
-        creds = None
+        cache_key = (self.credentials_file, self.token_file)
         
+        # Only the dict access is locked - token refresh and the browser OAuth flow can block for a long time
+        with _CREDENTIALS_CACHE_LOCK:
+            cached_creds = _CREDENTIALS_CACHE.get(cache_key)
+        
+        creds = self._load_credentials(cached_creds)
+        if not creds:
+            return False
+        
+        with _CREDENTIALS_CACHE_LOCK:
+            _CREDENTIALS_CACHE[cache_key] = creds
+        
+        # Build Gmail service
+        try:
+            self.service = build('gmail', 'v1', credentials=creds)
+            self.credentials = creds
+            self.authenticated = True
+            print("✅ Gmail API authentication successful!")
+            return True
+        except Exception as e:
+            print(f"❌ Gmail API authentication failed: {e}")
+            return False
+    
+    def _load_credentials(self, creds=None):
+        """
+        Return valid OAuth2 credentials, refreshing or re-authorizing only when needed
+        
+        Args:
+            creds: Previously loaded credentials (the token file is read when None)
+            
+        Returns:
+            Valid credentials, or None if the credentials file is missing
+        """
         # Load existing token
-        if os.path.exists(self.token_file):
+        if creds is None and os.path.exists(self.token_file):
             with open(self.token_file, 'rb') as token:
                 creds = pickle.load(token)
         
@@ -105,7 +219,7 @@ class GmailService:
                 if not os.path.exists(self.credentials_file):
                     print(f"Gmail credentials file '{self.credentials_file}' not found.")
                     print("Please download it from Google Cloud Console and place it in the project root.")
-                    return False
+                    return None
                 
                 flow = InstalledAppFlow.from_client_secrets_file(
                     self.credentials_file, self.SCOPES)
@@ -123,15 +237,7 @@ class GmailService:
             with open(self.token_file, 'wb') as token:
                 pickle.dump(creds, token)
         
-        # Build Gmail service
-        try:
-            self.service = build('gmail', 'v1', credentials=creds)
-            self.authenticated = True
-            print("✅ Gmail API authentication successful!")
-            return True
-        except Exception as e:
-            print(f"❌ Gmail API authentication failed: {e}")
-            return False
+        return creds
     
     def search_transaction_emails(self, days_back: int = 30, max_results: int = 100) -> List[Dict]:
         """
@@ -144,92 +250,110 @@ class GmailService:
         Returns:
             List of email data dictionaries
         """
+        return list(self.iter_transaction_emails(days_back=days_back, max_results=max_results))
+    
+    def iter_transaction_emails(self, days_back: int = 30, max_results: int = 100) -> Iterator[Dict]:
+        """
+        Search for transaction-related emails, yielding each one as soon as it is fetched
+        
+        Args:
+            days_back: Number of days to look back for emails
+            max_results: Maximum number of emails to fetch
+            
+        Returns:
+            Iterator of email data dictionaries
+        """
         if not self.authenticated:
             print("Gmail API not authenticated")
-            return []
+            return
         
         # Calculate date range
         start_date = datetime.now() - timedelta(days=days_back)
         query_date = start_date.strftime('%Y/%m/%d')
         
-        # Build search query - First try bank domains, then fall back to keywords only
-        bank_query = ' OR '.join([f'from:{domain}' for domain in self.bank_domains])
-        keyword_query = ' OR '.join(self.transaction_keywords)
-        
-        # Expanded bank/financial domains for broader but still focused search
-        financial_keywords = [
-            'bank', 'credit', 'debit', 'payment', 'transaction', 'upi', 'gpay', 
-            'paytm', 'phonepe', 'wallet', 'visa', 'mastercard', 'rupay'
-        ]
-        financial_query = ' OR '.join([f'from:*{domain}*' for domain in financial_keywords])
-        
-        # Try multiple queries in order of preference (VERY BROAD FOR DEBUGGING)
-        queries = [
-            f'from:indusind.com',  # Start with what we know exists
-            f'subject:(account OR bank OR payment OR transaction OR amount OR balance OR money OR rs OR rupee OR ₹)',  # Very broad subject search
-            f'(account OR bank OR payment OR transaction OR amount OR balance OR money OR rs OR rupee OR ₹) AND after:{query_date}',  # Very broad content search
-            f'from:*bank*',  # Any email from any bank
-            f'from:*pay*',  # Any payment service
-            f'from:*alert*',  # Any alert service
-            f'({bank_query}) AND ({keyword_query}) AND after:{query_date}',  # Original specific search
-        ]
+        # Single search query - bank senders OR transaction-looking subjects, evaluated by Gmail
+        from_clause = 'from:(' + ' OR '.join(self.bank_domains) + ')'
+        subject_clause = 'subject:(' + ' OR '.join(self.SUBJECT_SEARCH_TERMS) + ')'
+        query = f'({from_clause} OR {subject_clause}) after:{query_date}'
         
-        all_messages = []
-        
-        for i, query in enumerate(queries):
-            try:
-                print(f"🔍 Searching with query {i+1}: {query}")
-                
-                # Search for emails
-                results = self.service.users().messages().list(
-                    userId='me',
-                    q=query,
-                    maxResults=max_results
-                ).execute()
-                
-                messages = results.get('messages', [])
-                
-                if messages:
-                    print(f"📧 Found {len(messages)} emails with query {i+1}")
-                    all_messages.extend(messages)
-                    break  # Use first successful query
-                else:
-                    print(f"No emails found with query {i+1}")
-                    
-            except Exception as e:
-                print(f"Error with query {i+1}: {e}")
-                continue
+        try:
+            print(f"🔍 Searching with query: {query}")
+            message_ids = list(self._iter_message_ids(query, max_results))
+        except Exception as e:
+            print(f"Error searching transaction emails: {e}")
+            return
         
-        if not all_messages:
-            print("No transaction emails found with any query")
-            return []
+        if not message_ids:
+            print("No transaction emails found")
+            return
         
-        # Remove duplicates based on message ID
-        unique_messages = {msg['id']: msg for msg in all_messages}.values()
-        print(f"📧 Found {len(unique_messages)} unique potential transaction emails")
+        print(f"📧 Found {len(message_ids)} potential transaction emails")
         
-        # Get email details
-        email_data = []
+        # First pass: fetch headers only and drop emails that can't be transactional
+        accepted_count = 0
         skipped_count = 0
-        for i, message in enumerate(unique_messages, 1):
-            print(f"\n📧 Processing email {i}/{len(unique_messages)}...")
-            email_details = self._get_email_details(message['id'])
+        candidate_ids = []
+        for email_headers in self._iter_email_details(message_ids, headers_only=True):
+            if not email_headers:
+                continue
+            if self._is_transaction_header(email_headers):
+                candidate_ids.append(email_headers['id'])
+            else:
+                skipped_count += 1
+                print(f"❌ SKIPPED (headers): {email_headers['subject'][:60]}...")
+        
+        # Second pass: fetch full bodies only for the surviving candidates
+        for i, email_details in enumerate(self._iter_email_details(candidate_ids), 1):
+            print(f"\n📧 Processing email {i}/{len(candidate_ids)}...")
             if email_details:
                 # Additional filtering by content
                 if self._is_transaction_email(email_details):
-                    email_data.append(email_details)
+                    accepted_count += 1
                     print(f"✅ ADDED: {email_details['subject'][:60]}...")
+                    yield email_details
                 else:
                     skipped_count += 1
                     print(f"❌ SKIPPED: {email_details['subject'][:60]}...")
         
         print(f"\n{'='*60}")
         print(f"📊 FINAL RESULTS:")
-        print(f"   Total emails analyzed: {len(unique_messages)}")
-        print(f"   ✅ Accepted (transactional): {len(email_data)}")
+        print(f"   Total emails analyzed: {len(message_ids)}")
+        print(f"   ✅ Accepted (transactional): {accepted_count}")
         print(f"   ❌ Rejected (non-transactional): {skipped_count}")
         print(f"{'='*60}\n")
-        return email_data
+    
+    def _iter_message_ids(self, query: str, limit: int) -> Iterator[str]:
+        """
+        Page through messages.list() results, yielding unique message IDs
+        
+        Args:
+            query: Gmail search query
+            limit: Maximum number of IDs to yield
+            
+        Returns:
+            Iterator of Gmail message IDs
+        """
+        seen = set()
+        page_token = None
+        
+        while len(seen) < limit:
+            results = self.service.users().messages().list(
+                userId='me',
+                q=query,
+                maxResults=min(self.LIST_PAGE_SIZE, limit - len(seen)),
+                pageToken=page_token
+            ).execute()
+            
+            for message in results.get('messages', []):
+                if message['id'] not in seen:
+                    seen.add(message['id'])
+                    yield message['id']
+                    if len(seen) >= limit:
+                        return
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
     
     def _get_email_details(self, message_id: str) -> Optional[Dict]:
         """
@@ -248,33 +372,122 @@ class GmailService:
                 format='full'
             ).execute()
             
-            # Extract headers
-            headers = message['payload'].get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+            return self._parse_email_message(message)
+            
+        except Exception as e:
+            print(f"Error getting email details for {message_id}: {e}")
+            return None
+    
+    def _iter_email_details(self, message_ids: List[str], headers_only: bool = False) -> Iterator[Optional[Dict]]:
+        """
+        Fetch email details with batched Gmail API requests
+        
+        Args:
+            message_ids: Gmail message IDs
+            headers_only: Fetch only the metadata headers (body is left empty)
+            
+        Returns:
+            Iterator of email details (None for failed fetches), in the same order as message_ids
+        """
+        for start in range(0, len(message_ids), self.BATCH_SIZE):
+            chunk = message_ids[start:start + self.BATCH_SIZE]
+            details = {}
+            
+            def handle_response(request_id, response, exception):
+                if exception is not None:
+                    print(f"Error getting email details for {request_id}: {exception}")
+                    return
+                try:
+                    details[request_id] = self._parse_email_message(response, with_body=not headers_only)
+                except Exception as e:
+                    print(f"Error getting email details for {request_id}: {e}")
             
-            # Extract body
-            body = self._extract_email_body(message['payload'])
+            batch = self.service.new_batch_http_request(callback=handle_response)
+            for message_id in chunk:
+                batch.add(self._message_request(message_id, headers_only), request_id=message_id)
             
-            # Parse date
             try:
-                email_date = datetime.strptime(date.split(' (')[0], '%a, %d %b %Y %H:%M:%S %z')
-            except:
-                email_date = datetime.now()
+                batch.execute()
+            except Exception as e:
+                print(f"Error executing Gmail batch request, fetching messages individually: {e}")
+                yield from self._fetch_email_details_concurrently(chunk, headers_only)
+                continue
             
-            return {
-                'id': message_id,
-                'subject': subject,
-                'sender': sender,
-                'date': email_date,
-                'body': body,
-                'raw_date': date
-            }
+            for message_id in chunk:
+                yield details.get(message_id)
+    
+    def _message_request(self, message_id: str, headers_only: bool = False):
+        """Build the messages.get() request for a full or metadata-only fetch"""
+        if headers_only:
+            return self.service.users().messages().get(
+                userId='me', id=message_id, format='metadata', metadataHeaders=self.METADATA_HEADERS
+            )
+        return self.service.users().messages().get(userId='me', id=message_id, format='full')
+    
+    def _fetch_email_details_concurrently(self, message_ids: List[str], headers_only: bool = False) -> List[Optional[Dict]]:
+        """
+        Fetch email details one request per message on a thread pool (fallback for failed batches)
+        
+        Args:
+            message_ids: Gmail message IDs
+            headers_only: Fetch only the metadata headers (body is left empty)
             
-        except Exception as e:
-            print(f"Error getting email details for {message_id}: {e}")
-            return None
+        Returns:
+            List of email details (None for failed fetches), in the same order as message_ids
+        """
+        # httplib2 connections are not thread-safe, so each worker gets its own authorized transport
+        local = threading.local()
+        
+        def fetch(message_id):
+            http = getattr(local, 'http', None)
+            if http is None:
+                http = local.http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+            try:
+                message = self._message_request(message_id, headers_only).execute(http=http)
+                return self._parse_email_message(message, with_body=not headers_only)
+            except Exception as e:
+                print(f"Error getting email details for {message_id}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(self.FALLBACK_WORKERS, len(message_ids))) as executor:
+            return list(executor.map(fetch, message_ids))
+    
+    def _parse_email_message(self, message: Dict, with_body: bool = True) -> Dict:
+        """
+        Build the email details dictionary from a Gmail message
+        
+        Args:
+            message: Gmail API message resource
+            with_body: Decode the body (False for metadata-format messages)
+            
+        Returns:
+            Dictionary with email details
+        """
+        # Extract headers
+        headers = message['payload'].get('headers', [])
+        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
+        sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
+        date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+        
+        # Extract body (only the leading MAX_BODY_BASE64_CHARS are decoded)
+        text_part = self._find_text_part(message['payload']) if with_body else None
+        body = self._decode_text_part(text_part) if text_part else ''
+        
+        # Parse date
+        try:
+            email_date = parsedate_to_datetime(date)
+        except (TypeError, ValueError):
+            email_date = datetime.now()
+        
+        return {
+            'id': message['id'],
+            'subject': subject,
+            'sender': sender,
+            'date': email_date,
+            'body': body,
+            'body_size': text_part['body'].get('size', 0) if text_part else 0,
+            'raw_date': date
+        }
     
     def _extract_email_body(self, payload) -> str:
         """
@@ -286,20 +499,31 @@ class GmailService:
         Returns:
             Email body text
         """
-        body = ""
+        text_part = self._find_text_part(payload)
+        return self._decode_text_part(text_part) if text_part else ""
+    
+    def _find_text_part(self, payload) -> Optional[Dict]:
+        """Return the text/plain part of a message payload, if any"""
+        parts = payload['parts'] if 'parts' in payload else [payload]
+        return next((part for part in parts if part['mimeType'] == 'text/plain'), None)
+    
+    def _decode_text_part(self, part: Dict) -> str:
+        """
+        Decode a text/plain part, keeping only its first MAX_BODY_BASE64_CHARS of base64
         
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body']['data']
-                    body = base64.urlsafe_b64decode(data).decode('utf-8')
-                    break
-        else:
-            if payload['mimeType'] == 'text/plain':
-                data = payload['body']['data']
-                body = base64.urlsafe_b64decode(data).decode('utf-8')
+        Args:
+            part: Gmail message part
+            
+        Returns:
+            Decoded (possibly truncated) body text
+        """
+        data = part['body'].get('data', '')
+        if len(data) <= self.MAX_BODY_BASE64_CHARS:
+            return base64.urlsafe_b64decode(data).decode('utf-8')
         
-        return body
+        # Cutting on a 4-char boundary keeps the base64 valid; a split UTF-8 sequence at the end is dropped
+        truncated = data[:self.MAX_BODY_BASE64_CHARS]
+        return base64.urlsafe_b64decode(truncated).decode('utf-8', errors='ignore')
     
     def get_recent_bank_notifications(self, hours_back: int = 24) -> List[Dict]:
         """
@@ -322,17 +546,10 @@ class GmailService:
         query = f'({bank_query}) AND after:{query_date}'
         
         try:
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=50
-            ).execute()
-            
-            messages = results.get('messages', [])
             recent_emails = []
             
-            for message in messages:
-                email_details = self._get_email_details(message['id'])
+            message_ids = list(self._iter_message_ids(query, 50))
+            for email_details in self._iter_email_details(message_ids):
                 if email_details and self._contains_transaction_keywords(email_details['body']):
                     recent_emails.append(email_details)
             
@@ -352,8 +569,24 @@ class GmailService:
         Returns:
             True if contains transaction keywords
         """
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.transaction_keywords)
+        return self._transaction_keywords_re.search(text) is not None
+    
+    def _is_transaction_header(self, email_headers: Dict) -> bool:
+        """
+        Header-only pre-filter run before downloading the full message
+        
+        Args:
+            email_headers: Email details from a metadata-format fetch
+            
+        Returns:
+            True if the sender is a trusted bank or the subject has a transaction indicator
+        """
+        sender = email_headers.get('sender', '').lower()
+        if self._TRUSTED_BANKS_RE.search(sender):
+            return True
+        
+        subject = email_headers.get('subject', '').lower()
+        return self._STRONG_INDICATORS_RE.search(subject) is not None
     
     def _is_transaction_email(self, email_details: Dict) -> bool:
         """
@@ -369,54 +602,17 @@ class GmailService:
         # Combine subject and body for analysis
         text_to_check = f"{subject} {body}"
         
-        # STRONG transaction indicators - if ANY of these are present, it's likely transactional
-        strong_indicators = [
-            # Transaction keywords
-            'debited', 'credited', 'withdrawn', 'deposited', 'paid', 'received',
-            'transaction', 'payment', 'purchase', 'spent',
-            
-            # Amount patterns (INR)
-            'rs.', 'rs ', 'inr', '₹', 'rupees',
-            
-            # Account activity
-            'account', 'a/c', 'acc no', 'balance',
-            
-            # Payment methods
-            'upi', 'neft', 'imps', 'rtgs', 'card', 'atm', 'pos',
-            
-            # Transaction details
-            'ref no', 'reference number', 'txn', 'merchant', 'available balance',
-            
-            # Banking context
-            'bank alert', 'bank notification', 'transaction alert'
-        ]
-        
-        # Trusted bank domains - emails from these are likely transactional
-        trusted_banks = [
-            'hdfcbank', 'sbi.co.in', 'icicibank', 'axisbank', 'kotak', 
-            'indusind', 'yesbank', 'pnb', 'bankofbaroda', 'canarabank',
-            'unionbank', 'idbi', 'idfc', 'rbl', 'paytm', 'phonepe', 'googlepay',
-            'amazon.in', 'flipkart', 'myntra', 'swiggy', 'zomato', 'uber', 'ola'
-        ]
-        
-        # EXCLUDE promotional/marketing emails
-        exclude_patterns = [
-            'unsubscribe', 'newsletter', 'offer', 'discount', 'sale',
-            'limited time', 'hurry', 'shop now', 'buy now', 'free delivery',
-            'advertisement', 'promotional', 'marketing'
-        ]
-        
         # Check for exclusions first
-        has_spam_patterns = any(exclude in text_to_check for exclude in exclude_patterns)
+        has_spam_patterns = self._EXCLUDE_PATTERNS_RE.search(text_to_check) is not None
         if has_spam_patterns and 'transaction' not in text_to_check and 'payment' not in text_to_check:
             print(f"   ❌ Excluded - Marketing/Promotional email")
             return False
         
         # Check if sender is from trusted bank
-        is_trusted_sender = any(bank in sender for bank in trusted_banks)
+        is_trusted_sender = self._TRUSTED_BANKS_RE.search(sender) is not None
         
         # Check for strong transaction indicators
-        has_strong_indicator = any(indicator in text_to_check for indicator in strong_indicators)
+        has_strong_indicator = self._STRONG_INDICATORS_RE.search(text_to_check) is not None
         
         # Decision logic
         if is_trusted_sender and has_strong_indicator:
@@ -7,8 +7,10 @@ import os
 import base64
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from googleapiclient.discovery import build
@@ -26,6 +28,9 @@ class MultiAccountGmailService:
     
     SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
     
+    # Messages per Gmail batch request (Gmail throttles batches larger than 50)
+    BATCH_SIZE = 50
+    
     def __init__(self, credentials_file='credentials.json'):
         self.credentials_file = credentials_file
         self.accounts = {}  # Dictionary to store multiple account services
@@ -167,35 +172,37 @@ class MultiAccountGmailService:
         Returns:
             Dictionary with account emails and their transactions
         """
-        all_transactions = {}
-        
-        for account_name, account_info in self.accounts.items():
-            print(f"📧 Syncing account: {account_info['email']}")
-            
-            # Temporarily switch to this account
-            old_current = self.current_account
-            self.current_account = account_name
+        accounts = list(self.accounts.items())
+        if not accounts:
+            return {}
+        
+        # Each account has its own API client, so fetch all accounts concurrently
+        with ThreadPoolExecutor(max_workers=len(accounts)) as executor:
+            futures = {}
+            for account_name, account_info in accounts:
+                print(f"📧 Syncing account: {account_info['email']}")
+                futures[account_name] = executor.submit(
+                    self.search_transaction_emails, days_back=days_back, account_name=account_name
+                )
             
-            # Get transactions
-            transactions = self.search_transaction_emails(days_back=days_back)
-            all_transactions[account_name] = {
-                'email': account_info['email'],
-                'transactions': transactions
+            return {
+                account_name: {
+                    'email': account_info['email'],
+                    'transactions': futures[account_name].result()
+                }
+                for account_name, account_info in accounts
             }
-            
-            # Restore current account
-            self.current_account = old_current
-        
-        return all_transactions
     
-    def search_transaction_emails(self, days_back: int = 30, max_results: int = 100) -> List[Dict]:
-        """Search for transaction emails in current account"""
-        if not self.current_account or self.current_account not in self.accounts:
+    def search_transaction_emails(self, days_back: int = 30, max_results: int = 100,
+                                  account_name: Optional[str] = None) -> List[Dict]:
+        """Search for transaction emails in the given account (defaults to the current account)"""
+        account_name = account_name or self.current_account
+        if not account_name or account_name not in self.accounts:
             print("No current account selected")
             return []
         
-        service = self.accounts[self.current_account]['service']
-        account_email = self.accounts[self.current_account]['email']
+        service = self.accounts[account_name]['service']
+        account_email = self.accounts[account_name]['email']
         
         # Calculate date range
         start_date = datetime.now() - timedelta(days=days_back)
@@ -256,8 +263,8 @@ class MultiAccountGmailService:
         
         # Get email details
         email_data = []
-        for message in unique_messages:
-            email_details = self._get_email_details(message['id'], service)
+        message_ids = [message['id'] for message in unique_messages]
+        for email_details in self._iter_email_details(message_ids, service, account_email):
             if email_details:
                 # Additional filtering by content
                 if self._is_transaction_email(email_details):
@@ -269,8 +276,10 @@ class MultiAccountGmailService:
         print(f"📊 Final result for {account_email}: {len(email_data)} transaction emails")
         return email_data
     
-    def _get_email_details(self, message_id: str, service) -> Optional[Dict]:
+    def _get_email_details(self, message_id: str, service,
+                           account_email: Optional[str] = None) -> Optional[Dict]:
         """Get detailed information for a specific email"""
+        account_email = account_email or self.accounts[self.current_account]['email']
         try:
             message = service.users().messages().get(
                 userId='me', 
@@ -278,34 +287,73 @@ class MultiAccountGmailService:
                 format='full'
             ).execute()
             
-            # Extract headers
-            headers = message['payload'].get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+            return self._parse_email_message(message, account_email)
+            
+        except Exception as e:
+            print(f"Error getting email details for {message_id}: {e}")
+            return None
+    
+    def _iter_email_details(self, message_ids: List[str], service,
+                            account_email: str) -> Iterator[Optional[Dict]]:
+        """Fetch email details with batched Gmail API requests, in the same order as message_ids"""
+        for start in range(0, len(message_ids), self.BATCH_SIZE):
+            chunk = message_ids[start:start + self.BATCH_SIZE]
+            details = {}
+            
+            def handle_response(request_id, response, exception):
+                if exception is not None:
+                    print(f"Error getting email details for {request_id}: {exception}")
+                    return
+                try:
+                    details[request_id] = self._parse_email_message(response, account_email)
+                except Exception as e:
+                    print(f"Error getting email details for {request_id}: {e}")
             
-            # Extract body
-            body = self._extract_email_body(message['payload'])
+            batch = service.new_batch_http_request(callback=handle_response)
+            for message_id in chunk:
+                batch.add(
+                    service.users().messages().get(userId='me', id=message_id, format='full'),
+                    request_id=message_id
+                )
             
-            # Parse date
             try:
-                email_date = datetime.strptime(date.split(' (')[0], '%a, %d %b %Y %H:%M:%S %z')
-            except:
-                email_date = datetime.now()
+                batch.execute()
+            except Exception as e:
+                # Don't drop the whole chunk - fetch its messages one by one instead
+                print(f"Error executing Gmail batch request for {account_email}, fetching messages individually: {e}")
+                for message_id in chunk:
+                    yield self._get_email_details(message_id, service, account_email)
+                continue
             
-            return {
-                'id': message_id,
-                'subject': subject,
-                'sender': sender,
-                'date': email_date,
-                'body': body,
-                'raw_date': date,
-                'account_email': self.accounts[self.current_account]['email']
-            }
+            for message_id in chunk:
+                yield details.get(message_id)
+    
+    def _parse_email_message(self, message: Dict, account_email: str) -> Dict:
+        """Build the email details dictionary from a full-format Gmail message"""
+        # Extract headers
+        headers = message['payload'].get('headers', [])
+        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
+        sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
+        date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
             
-        except Exception as e:
-            print(f"Error getting email details: {e}")
-            return None
+        # Extract body
+        body = self._extract_email_body(message['payload'])
+        
+        # Parse date
+        try:
+            email_date = parsedate_to_datetime(date)
+        except (TypeError, ValueError):
+            email_date = datetime.now()
+        
+        return {
+            'id': message['id'],
+            'subject': subject,
+            'sender': sender,
+            'date': email_date,
+            'body': body,
+            'raw_date': date,
+            'account_email': account_email
+        }
     
     def _is_transaction_email(self, email_details: Dict) -> bool:
         """
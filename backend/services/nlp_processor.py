@@ -1,9 +1,31 @@
 # import spacy
 import re
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Union, Tuple
+from typing import List, Dict, Optional, Union, Tuple, Iterable, Iterator
 import json
 
+# Lines that separate messages in uploaded files: blank lines and dash/equals rules
+MESSAGE_BOUNDARY_PATTERN = re.compile(r'^(?:\s*$|-{3,}|={3,})')
+
+# Common SMS/email separators
+SEPARATOR_PATTERNS = [
+    re.compile(r'\n\s*\n', re.IGNORECASE),  # Double newline
+    re.compile(r'\n-{3,}', re.IGNORECASE),  # Line with dashes
+    re.compile(r'\n={3,}', re.IGNORECASE),  # Line with equals
+    re.compile(r'Subject:', re.IGNORECASE),  # Email subject line
+    re.compile(r'From:', re.IGNORECASE),     # Email from line
+]
+
+# Additional transaction details
+ACCOUNT_PATTERN = re.compile(r'(?:card|account).*?(\d{4})', re.IGNORECASE)
+REFERENCE_PATTERNS = [
+    re.compile(r'ref(?:erence)?[\s:]+([A-Z0-9]+)', re.IGNORECASE),
+    re.compile(r'txn[\s:]+([A-Z0-9]+)', re.IGNORECASE),
+    re.compile(r'transaction[\s:]+([A-Z0-9]+)', re.IGNORECASE)
+]
+BALANCE_PATTERN = re.compile(r'(?:balance|bal)[\s:]*(?:Rs\.?\s*|₹\s*)?([0-9,]+(?:\.[0-9]{2})?)', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
 class TransactionProcessor:
     """
     Natural Language Processing service for extracting transaction data
@@ -62,6 +84,15 @@ class TransactionProcessor:
             r'from\s+([A-Z][A-Z0-9\s&.-]+?)(?:\s+to|\s+on|\.|$)'
         ]
         
+        # Compile the pattern lists once instead of going through re's cache on every call
+        self._amount_regexes = [re.compile(p, re.IGNORECASE) for p in self.amount_patterns]
+        self._date_regexes = [re.compile(p, re.IGNORECASE) for p in self.date_patterns]
+        self._type_regexes = {
+            trans_type: [re.compile(p) for p in patterns]
+            for trans_type, patterns in self.transaction_type_patterns.items()
+        }
+        self._merchant_regexes = [re.compile(p, re.IGNORECASE) for p in self.merchant_patterns]
+        
         # Common merchant name mappings
         self.merchant_aliases = {
             'AMAZON': 'Amazon',
@@ -109,6 +140,20 @@ class TransactionProcessor:
         """
         return self.extract_transactions(text)
     
+    def process_texts(self, texts: Iterable[str]) -> Iterator[List[Dict]]:
+        """
+        Process many texts in one call, yielding one list of transactions per text
+        
+        Args:
+            texts: Iterable of raw email/SMS bodies
+            
+        Returns:
+            Iterator of transaction lists, in the same order as texts
+        """
+        # Extraction is regex-based and never reads a spaCy Doc, so running nlp.pipe here would only add cost
+        for text in texts:
+            yield self.extract_transactions(text)
+    
     def extract_transactions(self, text_data: str) -> List[Dict]:
         """
         Extract transaction information from text data (SMS/email content)
@@ -131,23 +176,40 @@ class TransactionProcessor:
         
         return transactions
     
+    def extract_transactions_iter(self, line_iter: Iterable[str]) -> Iterator[Dict]:
+        """
+        Extract transactions from a stream of lines without holding the whole text in memory
+        
+        Args:
+            line_iter: Iterable of text lines (e.g. an open file or upload stream)
+            
+        Returns:
+            Iterator of transaction dictionaries, yielded as each message completes
+        """
+        buffer = []
+        
+        for line in line_iter:
+            boundary = MESSAGE_BOUNDARY_PATTERN.match(line)
+            if boundary:
+                # Flush the completed message and keep any text after a dash/equals separator
+                if buffer:
+                    yield from self.extract_transactions(''.join(buffer))
+                remainder = line[boundary.end():]
+                buffer = [remainder] if remainder.strip() else []
+            else:
+                buffer.append(line)
+        
+        if buffer:
+            yield from self.extract_transactions(''.join(buffer))
+    
     def _split_messages(self, text_data: str) -> List[str]:
         """Split text data into individual transaction messages"""
-        # Common SMS/email separators
-        separators = [
-            r'\n\s*\n',  # Double newline
-            r'\n-{3,}',  # Line with dashes
-            r'\n={3,}',  # Line with equals
-            r'Subject:',  # Email subject line
-            r'From:',     # Email from line
-        ]
-        
         messages = [text_data]
         
-        for separator in separators:
+        for separator in SEPARATOR_PATTERNS:
             new_messages = []
             for msg in messages:
-                new_messages.extend(re.split(separator, msg, flags=re.IGNORECASE))
+                new_messages.extend(separator.split(msg))
             messages = [m.strip() for m in new_messages if m.strip()]
         
         return messages
@@ -217,8 +279,8 @@ class TransactionProcessor:
         """Extract monetary amount from text with validation to avoid phone numbers"""
         confidence = 0.0
         
-        for pattern in self.amount_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._amount_regexes:
+            matches = pattern.findall(text)
             if matches:
                 try:
                     # Clean amount string and convert to float
@@ -273,8 +335,8 @@ class TransactionProcessor:
         """Extract date from text"""
         confidence = 0.0
         
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._date_regexes:
+            matches = pattern.findall(text)
             if matches:
                 try:
                     date_str = matches[0]
@@ -308,9 +370,9 @@ class TransactionProcessor:
         """Determine if transaction is debit or credit"""
         text_lower = text.lower()
         
-        for trans_type, patterns in self.transaction_type_patterns.items():
+        for trans_type, patterns in self._type_regexes.items():
             for pattern in patterns:
-                if re.search(pattern, text_lower):
+                if pattern.search(text_lower):
                     confidence = 0.8 if trans_type == 'debit' else 0.7  # Bias towards debit
                     return trans_type, confidence
         
@@ -321,13 +383,13 @@ class TransactionProcessor:
         """Extract merchant/vendor name from text"""
         confidence = 0.0
         
-        for pattern in self.merchant_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._merchant_regexes:
+            matches = pattern.findall(text)
             if matches:
                 merchant = matches[0].strip()
                 
                 # Clean merchant name
-                merchant = re.sub(r'\s+', ' ', merchant)  # Remove extra spaces
+                merchant = WHITESPACE_PATTERN.sub(' ', merchant)  # Remove extra spaces
                 merchant = merchant.strip('.,;:')  # Remove trailing punctuation
                 
                 # Check for known aliases
@@ -396,27 +458,19 @@ class TransactionProcessor:
         additional_info = {}
         
         # Extract account last 4 digits
-        account_pattern = r'(?:card|account).*?(\d{4})'
-        account_match = re.search(account_pattern, text, re.IGNORECASE)
+        account_match = ACCOUNT_PATTERN.search(text)
         if account_match:
             additional_info['account_last_four'] = account_match.group(1)
         
         # Extract reference number
-        ref_patterns = [
-            r'ref(?:erence)?[\s:]+([A-Z0-9]+)',
-            r'txn[\s:]+([A-Z0-9]+)',
-            r'transaction[\s:]+([A-Z0-9]+)'
-        ]
-        
-        for pattern in ref_patterns:
-            ref_match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in REFERENCE_PATTERNS:
+            ref_match = pattern.search(text)
             if ref_match:
                 additional_info['reference_number'] = ref_match.group(1)
                 break
         
         # Extract balance information
-        balance_pattern = r'(?:balance|bal)[\s:]*(?:Rs\.?\s*|₹\s*)?([0-9,]+(?:\.[0-9]{2})?)'
-        balance_match = re.search(balance_pattern, text, re.IGNORECASE)
+        balance_match = BALANCE_PATTERN.search(text)
         if balance_match:
             try:
                 balance = float(balance_match.group(1).replace(',', ''))
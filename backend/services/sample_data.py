@@ -0,0 +1,186 @@
+"""
+Sample data for Smart Finance Automator
+Bank alert texts and transaction templates used by the sample sync and force refresh modes
+"""
+
+# Sample EMAIL TEXTS to parse in sample mode (realistic banking emails)
+SAMPLE_EMAIL_TEXTS = (
+    # HDFC Bank samples (various formats)
+    """Dear Customer, Your A/c XX1234 is debited with Rs.1,250.50 on 25-Nov-24 for purchase at BIG BAZAAR. 
+    Available balance: Rs.45,230.75. Info: HDFC Bank""",
+    
+    """Alert: Rs 850.75 debited from your account XX1234 on 26-Nov-24. 
+    Transaction at DMART SUPERMARKET via Card ending 4567. 
+    Avl Bal: Rs 44,380.00 -HDFC Bank""",
+    
+    # SBI Bank samples
+    """SBI: Your account XX5678 debited by INR 2,100.00 on 24-Nov-24 14:32 PM 
+    at RELIANCE FRESH. Ref# 123456789. Avl bal INR 42,280.00""",
+    
+    """Transaction Alert: INR 450.00 spent on 25-Nov-24 at STARBUCKS COFFEE using card XX9012. 
+    Current balance: INR 41,830.00 -State Bank of India""",
+    
+    # ICICI Bank samples
+    """ICICI Bank: Rs.1200.00 debited from A/c XX3456 on 26-NOV-24 
+    for txn at PIZZA HUT. Available Bal:Rs.40,630.00""",
+    
+    """Your ICICI Bank Card XX7890 charged Rs 350 at MCDONALDS on 27-Nov-24. 
+    Avl limit: Rs 40,280""",
+    
+    # UPI transactions
+    """Rs 800 debited from your a/c XX1234 via UPI to SWIGGY on 25-Nov-24 18:45. 
+    UPI Ref: 435678901234. Bal: Rs 39,480 -HDFC""",
+    
+    """UPI Payment successful! Rs.250.00 paid to UBER INDIA via UPI on 26-Nov-24. 
+    Ref: 987654321098. Account balance: Rs.39,230.00""",
+    
+    # Online shopping
+    """Payment of Rs 3,500.00 made to AMAZON SELLER SERVICES on 24-Nov-24 
+    from card XX4567. Transaction ID: AMZ123456789. -ICICI Bank""",
+    
+    """Your a/c debited Rs.1,800.00 on 25-Nov-24 for MYNTRA DESIGNS purchase. 
+    Order ID: MYN987654. Balance: Rs.35,930.00""",
+    
+    """Card transaction alert: Rs 2,200 spent at FLIPKART on 26-Nov-24. 
+    Txn ref: FKT456789. Available bal: Rs 33,730""",
+    
+    # Entertainment & subscriptions
+    """Your subscription payment of Rs.199.00 to NETFLIX.COM processed successfully on 25-Nov-24. 
+    Card XX5678 charged. Next billing: 25-Dec-24""",
+    
+    """Auto-debit: Rs 149 paid to SPOTIFY PREMIUM on 26-Nov-24 from a/c XX1234. 
+    Subscription active till 26-Dec-24. Bal: Rs 33,382""",
+    
+    """Rs.500.00 paid for BOOKMYSHOW tickets on 27-Nov-24. 
+    Booking ID: BMS123456. Transaction successful.""",
+    
+    # Transportation
+    """OLA CABS: Payment of Rs 150 completed on 25-Nov-24. 
+    Trip ID: OLA123456789. Paid via UPI from XX1234""",
+    
+    """Fuel purchase of Rs.2,500.00 at HP PETROL PUMP on 26-Nov-24 14:30 
+    using card XX9012. Balance: Rs.30,732.00""",
+    
+    # Utilities & bills
+    """BESCOM Bill Payment: Rs 2,800.00 debited from a/c XX1234 on 25-Nov-24. 
+    Bill period: Oct-24. Ref: BES987654321. Balance: Rs 27,932""",
+    
+    """Your Airtel Broadband bill of Rs.1,200.00 paid successfully on 26-Nov-24. 
+    Service number: 9876543210. Account: XX5678""",
+    
+    """Mobile recharge of Rs 450 for Jio number 9876543210 successful. 
+    Validity extended to 26-Dec-24. Paid from card XX1234""",
+    
+    # Healthcare
+    """Payment of Rs.800.00 made to APOLLO PHARMACY on 25-Nov-24. 
+    Prescription ID: APL123456. Card XX4567 used.""",
+    
+    """Rs 1,500 paid to CITY HOSPITAL for consultation on 26-Nov-24. 
+    Patient ID: 123456. UPI Ref: 456789012345""",
+    
+    # Large payments (EMI, credit card)
+    """Dear Customer, Rs.15,000.00 paid towards HDFC Credit Card bill on 25-Nov-24. 
+    Card ending 4567. Due date: 15-Dec-24. Outstanding: Rs.5,000.00""",
+    
+    """EMI Debit Alert: Rs 25,000 deducted from a/c XX5678 for SBI HOME LOAN on 26-Nov-24. 
+    Loan A/c: HL123456789. Balance: Rs.52,932.00 -SBI""",
+    
+    # Credits/Income
+    """Rs.75,000.00 credited to your account XX1234 on 25-Nov-24. 
+    Description: SALARY CREDIT - COMPANY PAYROLL. Balance: Rs.1,27,932.00""",
+    
+    """IMPS Credit: Rs 5,000.00 received in a/c XX1234 on 26-Nov-24 20:15. 
+    From: FREELANCE CLIENT. Ref: IMPS123456789. Bal: Rs 1,32,932""",
+    
+    # WRONG/MALFORMED SAMPLES (for testing processor robustness)
+    
+    # Missing amount
+    """Alert: Transaction at Big Bazaar on 25-Nov-24. 
+    Your card was used. Please check your account.""",
+    
+    # Promotional email (should be filtered)
+    """SALE ALERT! Get 50% off on all products at Big Bazaar! 
+    Hurry! Limited time offer. Shop now and save big!""",
+    
+    # Incomplete transaction
+    """Payment failed at Amazon on 26-Nov-24. 
+    Insufficient balance. Please add funds to your account.""",
+    
+    # OTP/Security message (not a transaction)
+    """Your OTP for HDFC NetBanking is 123456. Valid for 10 minutes. 
+    Do not share with anyone. -HDFC Bank""",
+    
+    # Account statement notification (not a transaction)
+    """Your account statement for Oct-2024 is ready. 
+    Download from netbanking. Total transactions: 45. -ICICI Bank""",
+    
+    # Malformed amount format
+    """Rs abc paid to merchant on date. Transaction successful. 
+    Balance: xyz rupees""",
+    
+    # Very old format
+    """Dear Sir/Madam, We wish to inform you that an amount of 
+    Rupees Five Hundred Fifty only has been debited from your account 
+    on the twenty-fifth day of November.""",
+    
+    # Multiple amounts (should pick transaction amount)
+    """Rs 999.00 debited for purchase at Store XYZ on 25-Nov-24. 
+    Cashback: Rs 50.00. Net amount: Rs 949.00. Balance: Rs 50,000.00""",
+)
+
+# Extended sample transaction templates for force refresh
+REFRESH_SAMPLE_TRANSACTIONS = (
+    # Groceries
+    {'amount': 1450.25, 'description': 'More Megastore - Fresh produce and essentials', 'merchant': 'More Megastore', 'category': 'groceries', 'type': 'debit'},
+    {'amount': 980.50, 'description': 'Spencer\'s Retail - Weekly grocery haul', 'merchant': 'Spencer\'s', 'category': 'groceries', 'type': 'debit'},
+    {'amount': 2300.75, 'description': 'Nature\'s Basket - Organic food shopping', 'merchant': 'Nature\'s Basket', 'category': 'groceries', 'type': 'debit'},
+    {'amount': 650.00, 'description': 'Local Kirana Store - Daily essentials', 'merchant': 'Kirana Store', 'category': 'groceries', 'type': 'debit'},
+    
+    # Dining & Food
+    {'amount': 520.00, 'description': 'Cafe Coffee Day - Coffee and pastry', 'merchant': 'CCD', 'category': 'dining', 'type': 'debit'},
+    {'amount': 1450.00, 'description': 'Dominos Pizza - Large pizza order', 'merchant': 'Dominos', 'category': 'dining', 'type': 'debit'},
+    {'amount': 380.00, 'description': 'Subway - Healthy lunch combo', 'merchant': 'Subway', 'category': 'dining', 'type': 'debit'},
+    {'amount': 920.00, 'description': 'Zomato Gold - Premium restaurant meal', 'merchant': 'Zomato', 'category': 'dining', 'type': 'debit'},
+    {'amount': 280.00, 'description': 'Tea Post - Evening snacks', 'merchant': 'Tea Post', 'category': 'dining', 'type': 'debit'},
+    
+    # Transportation
+    {'amount': 320.00, 'description': 'Ola Auto - Short distance ride', 'merchant': 'Ola', 'category': 'transportation', 'type': 'debit'},
+    {'amount': 180.00, 'description': 'Metro Card Recharge - Monthly pass', 'merchant': 'Metro', 'category': 'transportation', 'type': 'debit'},
+    {'amount': 2800.00, 'description': 'Indian Oil - Full tank fuel', 'merchant': 'Indian Oil', 'category': 'transportation', 'type': 'debit'},
+    {'amount': 450.00, 'description': 'Rapid Metro - Airport express', 'merchant': 'Rapid Metro', 'category': 'transportation', 'type': 'debit'},
+    
+    # Shopping & E-commerce
+    {'amount': 4200.00, 'description': 'Amazon Prime - Electronics and gadgets', 'merchant': 'Amazon', 'category': 'shopping', 'type': 'debit'},
+    {'amount': 2100.00, 'description': 'Myntra End of Season Sale - Fashion haul', 'merchant': 'Myntra', 'category': 'shopping', 'type': 'debit'},
+    {'amount': 1650.00, 'description': 'Nykaa Beauty - Cosmetics and skincare', 'merchant': 'Nykaa', 'category': 'shopping', 'type': 'debit'},
+    {'amount': 2900.00, 'description': 'Flipkart Big Billion Days - Home appliances', 'merchant': 'Flipkart', 'category': 'shopping', 'type': 'debit'},
+    {'amount': 850.00, 'description': 'Ajio Fashion - Trendy clothing', 'merchant': 'Ajio', 'category': 'shopping', 'type': 'debit'},
+    
+    # Entertainment
+    {'amount': 600.00, 'description': 'PVR Cinemas - Movie tickets for 2', 'merchant': 'PVR', 'category': 'entertainment', 'type': 'debit'},
+    {'amount': 399.00, 'description': 'Disney+ Hotstar - Annual subscription', 'merchant': 'Disney+ Hotstar', 'category': 'entertainment', 'type': 'debit'},
+    {'amount': 299.00, 'description': 'Amazon Prime Video - Monthly plan', 'merchant': 'Prime Video', 'category': 'entertainment', 'type': 'debit'},
+    {'amount': 750.00, 'description': 'GameStop - Video game purchase', 'merchant': 'GameStop', 'category': 'entertainment', 'type': 'debit'},
+    
+    # Utilities & Bills
+    {'amount': 3200.00, 'description': 'BSES Delhi - Electricity bill payment', 'merchant': 'BSES', 'category': 'utilities', 'type': 'debit'},
+    {'amount': 1450.00, 'description': 'JioFiber - High-speed internet monthly', 'merchant': 'JioFiber', 'category': 'utilities', 'type': 'debit'},
+    {'amount': 599.00, 'description': 'Vi Postpaid - Mobile bill payment', 'merchant': 'Vi', 'category': 'utilities', 'type': 'debit'},
+    {'amount': 850.00, 'description': 'Indraprastha Gas - Cooking gas refill', 'merchant': 'IGL', 'category': 'utilities', 'type': 'debit'},
+    
+    # Healthcare
+    {'amount': 1200.00, 'description': 'MedPlus Pharmacy - Prescription medicines', 'merchant': 'MedPlus', 'category': 'healthcare', 'type': 'debit'},
+    {'amount': 2500.00, 'description': 'Max Healthcare - Specialist consultation', 'merchant': 'Max Hospital', 'category': 'healthcare', 'type': 'debit'},
+    {'amount': 450.00, 'description': '1mg Online Pharmacy - Health supplements', 'merchant': '1mg', 'category': 'healthcare', 'type': 'debit'},
+    
+    # Bills & Financial
+    {'amount': 18500.00, 'description': 'ICICI Credit Card - Monthly payment', 'merchant': 'ICICI Bank', 'category': 'bills', 'type': 'debit'},
+    {'amount': 32000.00, 'description': 'HDFC Home Loan - EMI payment', 'merchant': 'HDFC Bank', 'category': 'bills', 'type': 'debit'},
+    {'amount': 5500.00, 'description': 'LIC Premium - Life insurance payment', 'merchant': 'LIC', 'category': 'bills', 'type': 'debit'},
+    
+    # Income/Credits
+    {'amount': 85000.00, 'description': 'Salary Credit - Monthly compensation', 'merchant': 'Employer', 'category': 'other', 'type': 'credit'},
+    {'amount': 8500.00, 'description': 'Freelance Project - Web development work', 'merchant': 'Client', 'category': 'other', 'type': 'credit'},
+    {'amount': 2200.00, 'description': 'Investment Returns - Mutual fund dividend', 'merchant': 'SBI Mutual Fund', 'category': 'other', 'type': 'credit'},
+    {'amount': 1200.00, 'description': 'Cashback Credit - Credit card rewards', 'merchant': 'HDFC Rewards', 'category': 'other', 'type': 'credit'},
+)
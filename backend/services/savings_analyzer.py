@@ -72,35 +72,49 @@ class SavingsAnalyzer:
         
         analysis = {
             'total_transactions': len(recent_transactions),
-            'total_spending': sum(float(t.amount) for t in recent_transactions if t.transaction_type == 'debit'),
+            'total_spending': 0,
             'monthly_average': 0,
             'category_breakdown': defaultdict(list),
             'merchant_breakdown': defaultdict(list),
             'monthly_trends': defaultdict(float),
-            'frequency_patterns': defaultdict(int),
-            'amount_patterns': defaultdict(list)
+            'frequency_patterns': defaultdict(int)
         }
         
         if not recent_transactions:
             return analysis
         
-        # Calculate monthly average
-        months_span = max(1, (datetime.now() - min(t.date for t in recent_transactions)).days / 30)
-        analysis['monthly_average'] = analysis['total_spending'] / months_span
+        category_breakdown = analysis['category_breakdown']
+        merchant_breakdown = analysis['merchant_breakdown']
+        monthly_trends = analysis['monthly_trends']
+        frequency_patterns = analysis['frequency_patterns']
         
-        # Group by categories and merchants
+        # Group by categories and merchants, tracking the total and earliest date in the same pass
+        total_spending = 0.0
+        earliest_date = None
         for transaction in recent_transactions:
-            if transaction.transaction_type == 'debit':
-                amount = float(transaction.amount)
-                category = transaction.category.name if transaction.category else 'Other'
-                merchant = transaction.merchant or 'Unknown'
-                month_key = transaction.date.strftime('%Y-%m')
-                
-                analysis['category_breakdown'][category].append(amount)
-                analysis['merchant_breakdown'][merchant].append(amount)
-                analysis['monthly_trends'][month_key] += amount
-                analysis['frequency_patterns'][category] += 1
-                analysis['amount_patterns'][category].append(amount)
+            date = transaction.date
+            if earliest_date is None or date < earliest_date:
+                earliest_date = date
+            
+            if transaction.transaction_type != 'debit':
+                continue
+            
+            amount = float(transaction.amount)
+            category_obj = transaction.category
+            category = category_obj.name if category_obj else 'Other'
+            merchant = transaction.merchant or 'Unknown'
+            month_key = f'{date.year:04d}-{date.month:02d}'
+            
+            total_spending += amount
+            category_breakdown[category].append(amount)
+            merchant_breakdown[merchant].append(amount)
+            monthly_trends[month_key] += amount
+            frequency_patterns[category] += 1
+        
+        # Calculate monthly average
+        months_span = max(1, (datetime.now() - earliest_date).days / 30)
+        analysis['total_spending'] = total_spending
+        analysis['monthly_average'] = total_spending / months_span
         
         return analysis
     
@@ -389,8 +403,7 @@ class SavingsAnalyzer:
 #             'BigBasket': [2000, 1800, 2200, 1900]
 #         },
 #         'monthly_trends': {'2024-08': 24000, '2024-09': 26000},
-#         'frequency_patterns': {'dining': 15, 'entertainment': 8, 'groceries': 12},
-#         'amount_patterns': {'dining': [150, 200, 180, 220, 175]}
+#         'frequency_patterns': {'dining': 15, 'entertainment': 8, 'groceries': 12}
 #     }
 #     
 #     print("Sample savings recommendations would be generated based on this analysis structure")
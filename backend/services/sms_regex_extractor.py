@@ -0,0 +1,110 @@
+"""
+Regex-based transaction extractor for Smart Finance Automator
+Fast path for short, rigidly formatted bank SMS/email alerts
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Precompiled patterns - built once at import time
+_AMT = re.compile(r'(?:Rs\.?|INR|₹)\s*([\d,]+(?:\.\d{1,2})?)', re.IGNORECASE)
+_MERCHANT = re.compile(
+    r'\b(?:at|to|for)\s+([A-Z][A-Z0-9&.\-]*\b(?:\s+[A-Z0-9&][A-Z0-9&.\-]*\b)*)'
+)
+_DATE = re.compile(
+    r'(\d{1,2}[-/](?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|\d{1,2})[-/]\d{2,4})',
+    re.IGNORECASE
+)
+_TYPE = re.compile(r'\b(debited|credited|paid|received|spent|charged|deducted)\b', re.IGNORECASE)
+_NON_TRANSACTION = re.compile(r'\b(?:otp|failed|declined)\b', re.IGNORECASE)
+
+_CREDIT_WORDS = {'credited', 'received'}
+
+_DATE_FORMATS = ('%d-%b-%y', '%d-%b-%Y', '%d/%m/%y', '%d/%m/%Y', '%d-%m-%y', '%d-%m-%Y')
+
+
+def _parse_date(date_str: str) -> Optional[datetime]:
+    """Parse a matched date string using the common bank alert formats"""
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _categorize(text_lower: str, category_keywords: Dict[str, List[str]]) -> Optional[str]:
+    """Pick the category with the most keyword hits"""
+    best_category = None
+    best_matches = 0
+
+    for category, keywords in category_keywords.items():
+        matches = sum(1 for keyword in keywords if keyword in text_lower)
+        if matches > best_matches:
+            best_matches = matches
+            best_category = category
+
+    return best_category
+
+
+def extract(text: str, category_keywords: Optional[Dict[str, List[str]]] = None) -> Optional[Dict]:
+    """
+    Extract a single transaction from a bank alert in one pass
+
+    Args:
+        text: Raw SMS/email text
+        category_keywords: Optional {category: [keywords]} table for categorization
+
+    Returns:
+        Transaction dictionary, or None if the text is not a transaction
+    """
+    if not text or _NON_TRANSACTION.search(text):
+        return None
+
+    amount_match = _AMT.search(text)
+    if not amount_match:
+        return None
+
+    try:
+        amount = float(amount_match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+
+    if amount <= 0:
+        return None
+
+    confidence = 0.5
+
+    type_match = _TYPE.search(text)
+    if type_match:
+        transaction_type = 'credit' if type_match.group(1).lower() in _CREDIT_WORDS else 'debit'
+        confidence += 0.15
+    else:
+        transaction_type = 'debit'
+
+    date_match = _DATE.search(text)
+    date = _parse_date(date_match.group(1)) if date_match else None
+    if date:
+        confidence += 0.2
+
+    merchant_match = _MERCHANT.search(text)
+    merchant = merchant_match.group(1).strip(' .') if merchant_match else None
+    if merchant:
+        confidence += 0.1
+
+    category = None
+    if category_keywords:
+        category = _categorize(f"{text.lower()} {(merchant or '').lower()}", category_keywords)
+        if category:
+            confidence += 0.05
+
+    return {
+        'amount': amount,
+        'description': ' '.join(text.split()),
+        'merchant': merchant or 'Unknown',
+        'type': transaction_type,
+        'date': date,
+        'category': category or 'other',
+        'confidence': round(confidence, 2)
+    }